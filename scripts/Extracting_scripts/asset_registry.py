@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+asset_registry.py
+
+SQLite registry of the asset-specific subreddits: which asset each subreddit
+belongs to, the asset's true name and type, and the post/comment totals.
+
+Test_scripts/checkingcount.py used to regroup
+true_asset_specific_subreddits_filter.csv with pandas on every run and write
+asset_engagement_stats.csv with the subreddit list as an unquoted
+comma-joined field, which every reader then had to special-case.  The
+registry keeps the same data in two indexed tables:
+
+    assets     (asset PRIMARY KEY, true_name, asset_type, total_posts, total_comments)
+    subreddits (display_name_prefixed PRIMARY KEY, asset, num_posts, num_comments)
+
+with secondary indexes on subreddits(asset), assets(asset_type) and
+assets(total_comments), so "subreddits of GME", "asset of r/Superstonk" or
+"crypto assets by volume" are B-tree lookups instead of CSV re-reads.
+`export_stats_csv` still writes asset_engagement_stats.csv, now properly
+quoted, for anything that wants the flat file.
+
+`AssetRegistry.assets()` returns the same dicts as `read_stats_csv`.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+
+REGISTRY_DB = "asset_registry.sqlite"
+FILTER_CSV  = "subreddits_list/true_asset_specific_subreddits_filter.csv"
+STATS_CSV   = "asset_engagement_stats.csv"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    asset          TEXT PRIMARY KEY,
+    true_name      TEXT,
+    asset_type     TEXT,
+    total_posts    INTEGER NOT NULL DEFAULT 0,
+    total_comments INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS subreddits (
+    display_name_prefixed TEXT PRIMARY KEY,
+    asset                 TEXT NOT NULL REFERENCES assets(asset),
+    num_posts             INTEGER,
+    num_comments          INTEGER
+);
+CREATE INDEX IF NOT EXISTS subreddits_by_asset ON subreddits(asset);
+CREATE INDEX IF NOT EXISTS assets_by_type ON assets(asset_type);
+CREATE INDEX IF NOT EXISTS assets_by_comments ON assets(total_comments DESC);
+"""
+
+
+def _count(value) -> int:
+    return int(float(value)) if value not in (None, '') else 0
+
+
+def read_stats_csv(csv_path) -> list:
+    """Rows of asset_engagement_stats.csv with the subreddit list split out.
+
+    Older files wrote the subreddit column unquoted, so a row may have one
+    field per subreddit after the first five columns; quoted files have one
+    comma-separated field.
+    """
+    assets = []
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) < 6:
+                continue
+            subreddits = [s.strip() for field in row[5:] for s in field.split(',') if s.strip()]
+            assets.append({
+                'asset'          : row[0],
+                'true_name'      : row[1],
+                'asset_type'     : row[2],
+                'total_posts'    : _count(row[3]),
+                'total_comments' : _count(row[4]),
+                'subreddits'     : subreddits,
+            })
+    return assets
+
+
+class AssetRegistry:
+    """Assets and their subreddits in an SQLite file."""
+
+    def __init__(self, path=REGISTRY_DB):
+        self.path = os.fspath(path)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> 'AssetRegistry':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── loading ──────────────────────────────────────────────────────────────
+    def load_filter_csv(self, path=FILTER_CSV) -> int:
+        """Replace the registry with the subreddits of true_asset_specific_subreddits_filter.csv.
+
+        Asset totals are the sums over their subreddits; true_name and
+        asset_type are the first non-empty ones in file order, like the
+        groupby 'first' checkingcount.py used.  Unlike that groupby, a
+        subreddit listed twice is kept once (its last row wins), so it is
+        not counted twice in the totals.
+        """
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = [r for r in csv.DictReader(f) if r.get('identified_asset')]
+        with self.db:
+            self.db.execute("DELETE FROM subreddits")
+            self.db.execute("DELETE FROM assets")
+            self.db.executemany("""
+                INSERT INTO assets (asset, true_name, asset_type) VALUES (?, ?, ?)
+                ON CONFLICT(asset) DO UPDATE SET
+                    true_name  = COALESCE(true_name, excluded.true_name),
+                    asset_type = COALESCE(asset_type, excluded.asset_type)
+            """, [(r['identified_asset'], r.get('true_name') or None, r.get('asset_type') or None)
+                  for r in rows])
+            self.db.executemany(
+                "INSERT OR REPLACE INTO subreddits VALUES (?, ?, ?, ?)",
+                [(r['display_name_prefixed'], r['identified_asset'],
+                  _count(r.get('num_posts')), _count(r.get('num_comments'))) for r in rows])
+            self.db.execute("""
+                UPDATE assets SET
+                    total_posts    = (SELECT COALESCE(SUM(num_posts), 0) FROM subreddits s WHERE s.asset = assets.asset),
+                    total_comments = (SELECT COALESCE(SUM(num_comments), 0) FROM subreddits s WHERE s.asset = assets.asset)
+            """)
+        return len(rows)
+
+    def load_stats_csv(self, path=STATS_CSV) -> int:
+        """Replace the registry with an asset_engagement_stats.csv, quoted or in the old unquoted layout."""
+        assets = read_stats_csv(path)
+        with self.db:
+            self.db.execute("DELETE FROM subreddits")
+            self.db.execute("DELETE FROM assets")
+            self.db.executemany(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?)",
+                [(a['asset'], a['true_name'], a['asset_type'], a['total_posts'], a['total_comments'])
+                 for a in assets])
+            # per-subreddit counts are not in the stats file
+            self.db.executemany(
+                "INSERT OR REPLACE INTO subreddits (display_name_prefixed, asset) VALUES (?, ?)",
+                [(sub, a['asset']) for a in assets for sub in a['subreddits']])
+        return len(assets)
+
+    # ── lookups ──────────────────────────────────────────────────────────────
+    def _with_subreddits(self, row) -> dict:
+        subs = [r[0] for r in self.db.execute(
+            "SELECT display_name_prefixed FROM subreddits WHERE asset = ? ORDER BY rowid",
+            (row['asset'],))]
+        return {'asset': row['asset'], 'true_name': row['true_name'], 'asset_type': row['asset_type'],
+                'total_posts': row['total_posts'], 'total_comments': row['total_comments'],
+                'subreddits': subs}
+
+    def asset(self, symbol: str) -> dict | None:
+        """One asset with its subreddit list, or None."""
+        row = self.db.execute("SELECT * FROM assets WHERE asset = ?", (symbol,)).fetchone()
+        return None if row is None else self._with_subreddits(row)
+
+    def assets(self, asset_type: str | None = None, only=None) -> list:
+        """Assets (optionally of one type or symbols), largest total_comments first."""
+        query, params = "SELECT * FROM assets", []
+        where = []
+        if asset_type is not None:
+            where.append("asset_type = ?")
+            params.append(asset_type)
+        if only:
+            only = list(only)
+            where.append(f"asset IN ({', '.join('?' * len(only))})")
+            params += only
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY total_comments DESC"
+        return [self._with_subreddits(row) for row in self.db.execute(query, params).fetchall()]
+
+    def asset_of(self, subreddit: str) -> str | None:
+        """The asset `subreddit` (e.g. 'r/Superstonk') belongs to, or None."""
+        row = self.db.execute("SELECT asset FROM subreddits WHERE display_name_prefixed = ?",
+                              (subreddit,)).fetchone()
+        return None if row is None else row[0]
+
+    def subreddits(self, symbol: str) -> list:
+        return (self.asset(symbol) or {}).get('subreddits', [])
+
+    # ── export ───────────────────────────────────────────────────────────────
+    def export_stats_csv(self, path=STATS_CSV) -> int:
+        """Write asset_engagement_stats.csv with the subreddit list as one quoted field."""
+        assets = self.assets()
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['identified_asset', 'true_name', 'asset_type', 'total_posts',
+                             'total_comments', 'subreddits'])
+            for a in assets:
+                writer.writerow([a['asset'], a['true_name'], a['asset_type'], a['total_posts'],
+                                 a['total_comments'], ', '.join(a['subreddits'])])
+        return len(assets)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Build and query the SQLite asset registry.")
+    p.add_argument("--db", default=REGISTRY_DB)
+    p.add_argument("--from-filter", nargs="?", const=FILTER_CSV,
+                   help="(re)build from true_asset_specific_subreddits_filter.csv")
+    p.add_argument("--from-stats", nargs="?", const=STATS_CSV,
+                   help="(re)build from an existing asset_engagement_stats.csv")
+    p.add_argument("--export", nargs="?", const=STATS_CSV, help="write asset_engagement_stats.csv")
+    p.add_argument("--show", nargs="*", default=[], help="print these assets (or subreddits, r/...)")
+    args = p.parse_args()
+
+    with AssetRegistry(args.db) as registry:
+        if args.from_filter:
+            print(f"Loaded {registry.load_filter_csv(args.from_filter)} subreddits from {args.from_filter}")
+        elif args.from_stats:
+            print(f"Loaded {registry.load_stats_csv(args.from_stats)} assets from {args.from_stats}")
+        if args.export:
+            print(f"Wrote {registry.export_stats_csv(args.export)} assets to {args.export}")
+        for key in args.show:
+            symbol = registry.asset_of(key) if key.startswith('r/') else key
+            asset = registry.asset(symbol) if symbol else None
+            if asset is None:
+                print(f"{key}: not in the registry")
+                continue
+            print(f"{asset['asset']} ({asset['true_name']}, {asset['asset_type']}): "
+                  f"{asset['total_comments']} comments, {asset['total_posts']} posts, "
+                  f"{len(asset['subreddits'])} subreddits: {', '.join(asset['subreddits'])}")
@@ -0,0 +1,53 @@
+"""
+author_filter.py
+
+Exclude bot and deleted accounts before aggregation.
+
+AutoModerator, `[deleted]` and subreddit bots otherwise enter the first-time
+author tables like anyone else and inflate the counts.  `AuthorFilter` drops
+their records before they are folded: an exact-name set checked first (one
+hash lookup), then optional regex rules, each compiled once and tried in
+order.  The rules are kept as separate patterns rather than joined into one
+alternation, so numbered backreferences and group names inside a rule mean
+what they say.  The aggregator counts the drops per rule in its data-quality
+report (data_quality.py).
+
+Filtering is off unless a filter is passed in; `AuthorFilter()` uses the
+default name list below.
+"""
+import re
+
+DEFAULT_EXCLUDED = (
+    '[deleted]',
+    'AutoModerator',
+    'VisualMod',               # r/wallstreetbets
+    'RemindMeBot',
+    'sneakpeekbot',
+    'WikiTextBot',
+    'RepostSleuthBot',
+    'SaveVideo',
+    'stonkmarketsbot',
+)
+
+
+class AuthorFilter:
+    """Exact names plus regex rules; `rule(author)` names the rule an author is dropped by."""
+
+    def __init__(self, names=DEFAULT_EXCLUDED, patterns=()):
+        self.names = frozenset(names)
+        self.patterns = tuple(patterns)
+        self._rules = [(re.compile(p), p) for p in self.patterns]
+
+    def rule(self, author):
+        """The rule dropping `author` (the name itself, or the regex), or None to keep it."""
+        if author in self.names:
+            return author
+        if author:
+            for regex, pattern in self._rules:
+                if regex.search(author) is not None:
+                    return pattern
+        return None
+
+    def signature(self) -> list:
+        """JSON-friendly description, stored in checkpoints so a changed filter forces a rebuild."""
+        return [sorted(self.names), list(self.patterns)]
@@ -0,0 +1,169 @@
+"""
+author_store.py
+
+Compact, exact first-time-author tracking.
+
+`AuthorStore` interns usernames to dense integer ids.  Names live back to back
+in one bytearray and are found through an open-addressing hash table held in
+flat `array` buffers, so each distinct author costs its UTF-8 length plus ~20
+bytes instead of a Python `str` plus a set slot (~80 bytes).  Lookups compare
+the stored bytes on every hash hit, so the store is exact; the CRC32 hash is
+deterministic, so the whole table is saved and reloaded as-is, without
+rehashing.
+
+One store is shared by the posts and comments passes: each stream only keeps
+a `SeenAuthors` flag per id, and behaves like the `set` it replaces
+(`in`, `add`, `len`, iteration) with `first_time` as the one-lookup fast path.
+"""
+import os
+import uuid
+import zlib
+from array import array
+
+import numpy as np
+
+_EMPTY = -1
+_MAX_LOAD = 0.5
+
+
+class AuthorStore:
+    """Username <-> dense id interning in array-backed storage."""
+
+    def __init__(self, capacity: int = 1 << 16):
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        self._blob    = bytearray()               # UTF-8 names back to back
+        self._offsets = array('q', [0])           # name i is _blob[_offsets[i]:_offsets[i + 1]]
+        self._hashes  = array('I')                # crc32 of name i
+        self._table   = array('i', [_EMPTY]) * capacity   # slot -> id
+        self._mask    = capacity - 1
+        self._streams = {}
+        self.generation = uuid.uuid4().hex        # changes on every save, see incremental_ingest
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _slot(self, enc: bytes, h: int) -> int:
+        """Table slot holding `enc`, or the empty slot where it would go."""
+        table, hashes, offsets, blob = self._table, self._hashes, self._offsets, self._blob
+        i = h & self._mask
+        while True:
+            j = table[i]
+            if j == _EMPTY or (hashes[j] == h and blob[offsets[j]:offsets[j + 1]] == enc):
+                return i
+            i = (i + 1) & self._mask
+
+    def lookup(self, name: str) -> int:
+        """Id of `name`, or -1 if it was never interned."""
+        enc = name.encode('utf-8')
+        return self._table[self._slot(enc, zlib.crc32(enc))]
+
+    def intern(self, name: str) -> int:
+        enc = name.encode('utf-8')
+        h = zlib.crc32(enc)
+        i = self._slot(enc, h)
+        j = self._table[i]
+        if j != _EMPTY:
+            return j
+
+        j = len(self._hashes)
+        self._blob += enc
+        self._offsets.append(len(self._blob))
+        self._hashes.append(h)
+        self._table[i] = j
+        if j + 1 > _MAX_LOAD * len(self._table):
+            self._grow()
+        return j
+
+    def name(self, i: int) -> str:
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].decode('utf-8')
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._table)
+        table = array('i', [_EMPTY]) * capacity
+        mask = capacity - 1
+        for j, h in enumerate(self._hashes):
+            i = h & mask
+            while table[i] != _EMPTY:
+                i = (i + 1) & mask
+            table[i] = j
+        self._table, self._mask = table, mask
+
+    def stream(self, key: str) -> 'SeenAuthors':
+        """The seen-author flags of one stream ('post', 'comment', ...), created on first use."""
+        seen = self._streams.get(key)
+        if seen is None:
+            seen = self._streams[key] = SeenAuthors(self)
+        return seen
+
+    def save(self, path) -> None:
+        """Write the store and all stream flags to `path` (.npz) atomically."""
+        self.generation = uuid.uuid4().hex
+        arrays = {
+            'blob'       : np.frombuffer(bytes(self._blob), dtype=np.uint8),
+            'offsets'    : np.array(self._offsets, dtype=np.int64),
+            'hashes'     : np.array(self._hashes, dtype=np.uint32),
+            'table'      : np.array(self._table, dtype=np.int32),
+            'generation' : np.array(self.generation),
+        }
+        for key, seen in self._streams.items():
+            arrays[f'seen_{key}'] = np.frombuffer(bytes(seen._flags), dtype=np.uint8)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> 'AuthorStore':
+        data = np.load(path)
+        store = cls(capacity=2)
+        store._blob = bytearray(data['blob'].tobytes())
+        store._offsets = array('q', data['offsets'].astype(np.int64).tobytes())
+        store._hashes = array('I', data['hashes'].astype(np.uint32).tobytes())
+        store._table = array('i', data['table'].astype(np.int32).tobytes())
+        store._mask = len(store._table) - 1
+        store.generation = str(data['generation'])
+        for key in data.files:
+            if key.startswith('seen_'):
+                seen = store.stream(key[len('seen_'):])
+                seen._flags = bytearray(data[key].tobytes())
+                seen._count = seen._flags.count(1)
+        return store
+
+
+class SeenAuthors:
+    """Set-like view of the authors one stream has already seen."""
+
+    def __init__(self, store: AuthorStore):
+        self.store = store
+        self._flags = bytearray()       # one byte per store id
+        self._count = 0
+
+    def first_time(self, author: str) -> bool:
+        """Mark `author` as seen; True if this is their first appearance in the stream."""
+        i = self.store.intern(author)
+        flags = self._flags
+        if i >= len(flags):
+            flags.extend(bytes(max(i + 1, len(self.store)) - len(flags) + 4096))
+        elif flags[i]:
+            return False
+        flags[i] = 1
+        self._count += 1
+        return True
+
+    def add(self, author: str) -> None:
+        self.first_time(author)
+
+    def clear(self) -> None:
+        self._flags = bytearray()
+        self._count = 0
+
+    def __contains__(self, author: str) -> bool:
+        i = self.store.lookup(author)
+        return 0 <= i < len(self._flags) and self._flags[i] == 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for i, flag in enumerate(self._flags):
+            if flag:
+                yield self.store.name(i)
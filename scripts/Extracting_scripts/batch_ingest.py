@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+batch_ingest.py
+
+Build one daily panel per asset listed in the asset registry
+(asset_registry.py) or asset_engagement_stats.csv.
+
+Every asset's subreddits are mapped to their dumps under
+`data_raw/{ASSET}/r_{subreddit}_{posts|comments}.jsonl[.zst]` (the layout
+raw_data_to_csv.py already uses, e.g. data_raw/AMD/r_amd_stock_posts.jsonl)
+and merged into one created_utc-ordered stream per asset (kway_merge.py).
+Assets are scheduled on a process pool largest-first by total_comments so the
+long GME/BTC builds start immediately instead of trailing at the end.
+A per-asset throughput summary is written next to the panels.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from price_cache import LocalProvider, PriceCache, yfinance_provider
+from author_filter import AuthorFilter
+from buckets import BUCKETS
+from raw_data_to_csv import PRICE_CACHE_DIR, build_panel
+from asset_registry import REGISTRY_DB, AssetRegistry, read_stats_csv as read_assets
+
+ASSETS_CSV = "asset_engagement_stats.csv"
+DATA_ROOT  = "data_raw"
+OUT_DIR    = "data_clean"
+
+
+def yf_ticker(asset: dict) -> str:
+    # yfinance quotes cryptocurrencies against USD, e.g. BTC-USD
+    return f"{asset['asset']}-USD" if asset['asset_type'] == 'Crypto' else asset['asset']
+
+
+# plain dumps first, then the compressed deliveries dump_io.py can stream directly
+DUMP_SUFFIXES = ('.jsonl', '.jsonl.zst', '.zst', '.jsonl.gz', '.jsonl.bz2')
+
+
+def dump_paths(asset: dict, data_root: Path | str, kind: str) -> list:
+    """Existing `kind` ('posts' or 'comments') dumps for every subreddit of `asset`."""
+    paths = []
+    for sub in asset['subreddits']:
+        sub = sub[2:] if sub.startswith('r/') else sub
+        stem = os.path.join(data_root, asset['asset'], f"r_{sub.lower()}_{kind}")
+        path = next((stem + ext for ext in DUMP_SUFFIXES if os.path.exists(stem + ext)), None)
+        if path is not None:
+            paths.append(path)
+    return paths
+
+
+def panel_name(asset: dict, bucket: str = '1d') -> str:
+    # daily panels keep the historical {ASSET}_data name
+    return f"{asset['asset']}_data" if bucket == '1d' else f"{asset['asset']}_data_{bucket}"
+
+
+def build_asset(asset: dict, data_root: Path | str, out_dir: Path | str,
+                checkpoint_dir: Path | str | None = None,
+                price_cache: PriceCache | None = None,
+                extras: bool = False,
+                bucket: str = '1d',
+                author_filter: AuthorFilter | None = None) -> dict:
+    """Build one panel and return its throughput row for the summary."""
+    posts    = dump_paths(asset, data_root, 'posts')
+    comments = dump_paths(asset, data_root, 'comments')
+    row = {
+        'asset'          : asset['asset'],
+        'posts_files'    : len(posts),
+        'comments_files' : len(comments),
+        'mb'             : sum(os.path.getsize(p) for p in posts + comments) / 1e6,
+        'records'        : 0,
+        'rows'           : 0,
+        'seconds'        : 0.0,
+        'status'         : 'ok',
+    }
+    if not posts or not comments:
+        row['status'] = 'missing dumps'
+        return row
+
+    t0 = time.perf_counter()
+    try:
+        panel = build_panel(yf_ticker(asset), posts, comments,
+                            os.path.join(out_dir, panel_name(asset, bucket)), workers=1,
+                            checkpoint_dir=checkpoint_dir, price_cache=price_cache,
+                            extras=extras, bucket=bucket, author_filter=author_filter)
+    except Exception as e:
+        row['status'] = f"error: {e}"
+        return row
+    row['seconds'] = time.perf_counter() - t0
+    row['records'] = int(panel['post_count'].sum() + panel['comment_count'].sum())
+    row['rows']    = len(panel)
+    return row
+
+
+def run_batch(assets_csv: Path | str = ASSETS_CSV,
+              data_root:  Path | str = DATA_ROOT,
+              out_dir:    Path | str = OUT_DIR,
+              workers:    int = os.cpu_count(),
+              only:       list | None = None,
+              checkpoint_dir: Path | str | None = None,
+              price_cache: PriceCache | None = None,
+              extras: bool = False,
+              bucket: str = '1d',
+              author_filter: AuthorFilter | None = None) -> pd.DataFrame:
+    if Path(assets_csv).suffix in ('.sqlite', '.db'):
+        with AssetRegistry(assets_csv) as registry:
+            assets = registry.assets(only=only)
+    else:
+        assets = read_assets(assets_csv)
+        if only:
+            assets = [a for a in assets if a['asset'] in set(only)]
+    # largest first, so the biggest builds overlap with all the small ones
+    assets.sort(key=lambda a: a['total_comments'], reverse=True)
+    os.makedirs(out_dir, exist_ok=True)
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_asset, a, data_root, out_dir, checkpoint_dir, price_cache,
+                               extras, bucket, author_filter)
+                   for a in assets]
+        for fut in as_completed(futures):
+            row = fut.result()
+            rows.append(row)
+            print(f"[{len(rows)}/{len(assets)}] {row['asset']}: {row['status']} "
+                  f"({row['mb']:.1f} MB in {row['seconds']:.1f}s)")
+
+    summary = pd.DataFrame(rows)
+    secs = summary['seconds'].where(summary['seconds'] > 0)
+    summary['mb_per_s']      = (summary['mb'] / secs).fillna(0.0)
+    summary['records_per_s'] = (summary['records'] / secs).fillna(0.0)
+    summary = summary.sort_values('mb', ascending=False)
+    summary.to_csv(os.path.join(out_dir, "batch_summary.csv"), index=False, float_format="%.2f")
+    return summary
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Build a daily panel for every asset.")
+    p.add_argument("--assets",    type=Path,
+                   default=Path(REGISTRY_DB if os.path.exists(REGISTRY_DB) else ASSETS_CSV),
+                   help="asset registry (.sqlite/.db) or asset_engagement_stats.csv")
+    p.add_argument("--data-root", type=Path, default=Path(DATA_ROOT))
+    p.add_argument("--out-dir",   type=Path, default=Path(OUT_DIR))
+    p.add_argument("--workers",   type=int,  default=os.cpu_count())
+    p.add_argument("--only",      nargs="*", help="restrict to these asset symbols")
+    p.add_argument("--checkpoint-dir", type=Path,
+                   help="keep per-stream checkpoints and only fold newly appended lines")
+    p.add_argument("--price-cache", type=Path, default=Path(PRICE_CACHE_DIR))
+    p.add_argument("--offline-prices", action="store_true",
+                   help="use cached prices only, never download")
+    p.add_argument("--price-source", type=Path,
+                   help="serve prices from {TICKER}.csv files here instead of yfinance")
+    p.add_argument("--extra-features", action="store_true",
+                   help="also build post_score, post_downvotes and comment_score")
+    p.add_argument("--bucket", choices=BUCKETS, default="1d",
+                   help="aggregation width; non-daily panels get a _{bucket} suffix")
+    p.add_argument("--exclude-bots", action="store_true",
+                   help="drop AutoModerator, [deleted] and known bot accounts before aggregation")
+    p.add_argument("--exclude-pattern", action="append", default=[],
+                   help="extra regex rule for excluded authors (implies --exclude-bots)")
+    args = p.parse_args()
+
+    provider = LocalProvider(args.price_source) if args.price_source else yfinance_provider
+    prices = PriceCache(args.price_cache, provider, offline=args.offline_prices)
+    author_filter = (AuthorFilter(patterns=args.exclude_pattern)
+                     if args.exclude_bots or args.exclude_pattern else None)
+    summary = run_batch(args.assets, args.data_root, args.out_dir, args.workers, args.only,
+                        args.checkpoint_dir, prices, args.extra_features, args.bucket, author_filter)
+    ok = summary[summary['status'] == 'ok']
+    print(f"Built {len(ok)}/{len(summary)} panels, "
+          f"{ok['mb'].sum():.1f} MB at {ok['mb'].sum() / max(ok['seconds'].sum(), 1e-9):.1f} MB/s per worker")
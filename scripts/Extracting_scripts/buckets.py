@@ -0,0 +1,74 @@
+"""
+buckets.py
+
+Time buckets for the engagement aggregates: '1h', '4h', '1d' or 'session'.
+
+A record's bucket is an integer computed from its epoch seconds alone
+(`created_utc // width`), so no per-record datetime object is ever built.
+Bucket n starts at n * width seconds since the epoch (UTC), which is also how
+the aggregate frames turn bucket numbers back into timestamps, one vectorized
+call per frame.
+
+'session' buckets are NYSE trading days labelled by their date.  A session
+collects everything up to its 16:00 New York close; later records, and
+weekend ones, count towards the next weekday's session.  The close is looked
+up once per UTC day (DST-aware) and cached, so the per-record work is still
+one division and one comparison.  Exchange holidays are not modelled: their
+records form a session of their own, which the price merge fills forward.
+"""
+from datetime import datetime, time, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+BUCKETS = ('1h', '4h', '1d', 'session')
+_WIDTH = {'1h': 3600, '4h': 4 * 3600, '1d': 86400, 'session': 86400}
+
+SESSION_TZ    = ZoneInfo('America/New_York')
+SESSION_CLOSE = time(16, 0)
+
+
+def bucket_width(bucket: str) -> int:
+    """Seconds per bucket number (sessions are numbered by UTC day)."""
+    try:
+        return _WIDTH[bucket]
+    except KeyError:
+        raise ValueError(f"unknown bucket {bucket!r}, expected one of {BUCKETS}") from None
+
+
+class SessionCalendar:
+    """Maps a record to the trading session (epoch day number) it counts towards."""
+
+    def __init__(self):
+        self._close = {}          # UTC day number -> that day's close in epoch seconds
+
+    def _close_of(self, day: int) -> int:
+        date = datetime.fromtimestamp(day * 86400, timezone.utc).date()
+        return int(datetime.combine(date, SESSION_CLOSE, SESSION_TZ).timestamp())
+
+    def label(self, created_utc, day: int) -> int:
+        """Session of a record at `created_utc`, given its UTC day number `day`."""
+        close = self._close.get(day)
+        if close is None:
+            close = self._close[day] = self._close_of(day)
+        if created_utc >= close:
+            day += 1
+        weekday = (day + 3) % 7       # 1970-01-01 was a Thursday; Monday == 0
+        if weekday >= 5:
+            day += 7 - weekday
+        return day
+
+
+def bucket_starts(numbers, bucket: str) -> pd.DatetimeIndex:
+    """Start timestamps of the given bucket numbers."""
+    return pd.to_datetime(np.asarray(numbers, dtype='int64') * bucket_width(bucket), unit='s')
+
+
+def bucket_range(start, end, bucket: str) -> pd.DatetimeIndex:
+    """Every bucket start from `start` to `end` inclusive, for zero-filling gaps."""
+    if bucket == 'session':
+        return pd.bdate_range(start, end)
+    if bucket == '1d':
+        return pd.date_range(start, end, freq='D')
+    return pd.date_range(start, end, freq=pd.Timedelta(seconds=bucket_width(bucket)))
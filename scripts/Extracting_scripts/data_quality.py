@@ -0,0 +1,138 @@
+"""
+data_quality.py
+
+Data-quality counters collected by the ingestion loop while it parses.
+
+Every line the aggregators see goes through `DataQuality.decode` and every
+decoded record through `DataQuality.check`, so malformed lines, records
+without `created_utc`, `[deleted]` authors and out-of-order timestamps are
+counted in the same pass that builds the panel, instead of by a separate
+counting script re-reading the dump.  Records dropped by an author filter
+(author_filter.py) are counted per rule under `excluded_authors`.
+raw_data_to_csv.py writes the counters of both streams to
+`{name}_quality.json` next to the CSV.
+
+A line the decoder rejects is counted as malformed and skipped.  The
+projection decoder (json_projection.py) only validates the bytes it reads,
+so a damaged line without any of the wanted keys shows up as a missing
+`created_utc` instead.  A `created_utc` that is null or not a number is
+counted as `bad_created_utc` and the record is dropped, as the old
+`pd.to_datetime(..., errors='coerce')` turned it into NaT.  A timestamp is
+out of order when it is older than the previous record of the same dump.
+"""
+import json
+import math
+
+DELETED = '[deleted]'
+
+
+def timestamp(value):
+    """`value` as epoch seconds (int or float), or None if it is null or not a number."""
+    if type(value) is int:
+        return value
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+class DataQuality:
+    """Counters for one stream ('post' or 'comment')."""
+
+    COUNTERS = ('lines', 'malformed_lines', 'missing_created_utc', 'bad_created_utc',
+                'deleted_authors', 'out_of_order', 'duplicate_ids')
+
+    def __init__(self):
+        self.lines = 0
+        self.malformed_lines = 0
+        self.missing_created_utc = 0
+        self.bad_created_utc = 0
+        self.deleted_authors = 0
+        self.out_of_order = 0
+        self.duplicate_ids = 0
+        self.excluded = {}               # author filter rule -> records dropped
+        self.max_backstep = 0            # largest backwards jump in created_utc, seconds
+        self.first_created_utc = None
+        self.last_created_utc = None
+        self._last = {}                  # source (dump) index -> previous created_utc
+
+    def decode(self, projector, line: bytes):
+        """The decoded record, or None if the line is malformed."""
+        self.lines += 1
+        try:
+            obj = projector.loads(line)
+        except ValueError:
+            self.malformed_lines += 1
+            return None
+        if not isinstance(obj, dict):
+            self.malformed_lines += 1
+            return None
+        return obj
+
+    def check(self, obj: dict, source: int = 0):
+        """Count `obj`; returns its created_utc as a number, or None if the record has to be dropped."""
+        if obj.get('author') == DELETED:
+            self.deleted_authors += 1
+        if 'created_utc' not in obj:
+            self.missing_created_utc += 1
+            return None
+        t = timestamp(obj['created_utc'])
+        if t is None:
+            self.bad_created_utc += 1
+            return None
+        last = self._last.get(source)
+        if last is not None and t < last:
+            self.out_of_order += 1
+            self.max_backstep = max(self.max_backstep, last - t)
+        self._last[source] = t
+        if self.first_created_utc is None:
+            self.first_created_utc = t
+        self.last_created_utc = t
+        return t
+
+    def merge(self, later: 'DataQuality') -> None:
+        """Add the counters of the next chunk of the same dump (parallel_ingest.py)."""
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(later, name))
+        for rule, n in later.excluded.items():
+            self.excluded[rule] = self.excluded.get(rule, 0) + n
+        self.max_backstep = max(self.max_backstep, later.max_backstep)
+        # the chunk boundary itself can be out of order too
+        if self.last_created_utc is not None and later.first_created_utc is not None \
+                and later.first_created_utc < self.last_created_utc:
+            self.out_of_order += 1
+            self.max_backstep = max(self.max_backstep,
+                                    self.last_created_utc - later.first_created_utc)
+        if self.first_created_utc is None:
+            self.first_created_utc = later.first_created_utc
+        if later.last_created_utc is not None:
+            self.last_created_utc = later.last_created_utc
+            self._last[0] = later.last_created_utc
+
+    def to_dict(self) -> dict:
+        report = {name: getattr(self, name) for name in self.COUNTERS}
+        report['excluded_authors'] = dict(self.excluded)
+        report['max_backstep_seconds'] = self.max_backstep
+        report['first_created_utc'] = self.first_created_utc
+        report['last_created_utc'] = self.last_created_utc
+        return report
+
+    @classmethod
+    def from_dict(cls, report: dict) -> 'DataQuality':
+        quality = cls()
+        for name in cls.COUNTERS:
+            setattr(quality, name, report.get(name, 0))
+        quality.excluded = dict(report.get('excluded_authors', {}))
+        quality.max_backstep = report.get('max_backstep_seconds', 0)
+        quality.first_created_utc = report.get('first_created_utc')
+        quality.last_created_utc = report.get('last_created_utc')
+        return quality
+
+
+def write_report(path, streams: dict) -> None:
+    """Write {prefix: counters} to `path` as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(streams, f, indent=2)
@@ -0,0 +1,186 @@
+"""
+dump_io.py
+
+Read Reddit dumps (.jsonl, .zst, .gz, .bz2) as a stream of lines.
+
+Compressed dumps are decompressed on the fly instead of being unpacked to disk
+first.  A background thread reads and decompresses large blocks into a small
+queue while the caller parses lines; zstd, zlib and bz2 release the GIL while
+they work, so decompression and parsing overlap.  Each reader keeps byte and
+timing counters and reports MB/s for the compressed input, the decompressed
+output, and how long the parser sat waiting on the decompressor -- if that
+wait is most of the wall time, the job is decompression-bound, otherwise
+parse-bound.
+
+`.zst` support needs the optional `zstandard` package.
+"""
+import bz2
+import gzip
+import io
+import os
+import queue
+import threading
+import time
+
+READ_SIZE   = 16 * 1024 * 1024     # decompressed bytes per block handed to the parser
+QUEUE_DEPTH = 4                    # blocks decompressed ahead of the parser
+COMPRESSED  = ('.zst', '.gz', '.bz2')
+
+
+def is_compressed(path) -> bool:
+    return os.fspath(path).endswith(COMPRESSED)
+
+
+def _open_raw(path, counter: list, read_size: int = READ_SIZE) -> tuple:
+    """(decompressed stream, underlying file); `counter[0]` tracks compressed bytes read."""
+    path = os.fspath(path)
+    fh = _CountingFile(open(path, 'rb', buffering=read_size), counter)
+    try:
+        return _decompressor(path, fh, read_size), fh
+    except BaseException:
+        fh.close()
+        raise
+
+
+def _decompressor(path: str, fh, read_size: int = READ_SIZE):
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("reading .zst dumps needs the 'zstandard' package") from None
+        # Pushshift/Arctic Shift dumps are written with a 2 GB window
+        dctx = zstandard.ZstdDecompressor(max_window_size=2 ** 31)
+        return dctx.stream_reader(fh, read_size=read_size, read_across_frames=True, closefd=False)
+    if path.endswith('.gz'):
+        return gzip.GzipFile(fileobj=fh, mode='rb')
+    if path.endswith('.bz2'):
+        return bz2.BZ2File(fh, mode='rb')
+    return fh
+
+
+class _CountingFile(io.RawIOBase):
+    def __init__(self, fh, counter: list):
+        self._fh, self._counter = fh, counter
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self._fh.readinto(b)
+        self._counter[0] += n
+        return n
+
+    def read(self, size=-1) -> bytes:
+        data = self._fh.read(size)
+        self._counter[0] += len(data)
+        return data
+
+    def seek(self, offset, whence=io.SEEK_SET) -> int:
+        return self._fh.seek(offset, whence)
+
+    def close(self) -> None:
+        self._fh.close()
+        super().close()
+
+
+class DumpReader:
+    """Iterate the lines (bytes, newline included) of a plain or compressed dump.
+
+    `offset` skips that many decompressed bytes first: a seek for plain files,
+    a discard for compressed ones (still decompressed, but never parsed).
+    `read_size` is the block size; readers that run many dumps side by side
+    (kway_merge.py) use smaller blocks to bound memory.
+    """
+
+    def __init__(self, path, offset: int = 0, read_size: int = READ_SIZE):
+        self.path = os.fspath(path)
+        self.offset = offset
+        self.read_size = read_size
+        self._compressed_in = [0]
+        self.bytes_out = 0           # decompressed bytes handed to the parser
+        self.wait_seconds = 0.0      # parser time spent blocked on the reader thread
+        self.seconds = 0.0
+        self._queue = queue.Queue(maxsize=QUEUE_DEPTH)
+        self._stop = threading.Event()
+        self._thread = None
+        self._error = None
+
+    @property
+    def bytes_in(self) -> int:
+        return self._compressed_in[0]
+
+    def _produce(self) -> None:
+        raw = fh = None
+        try:
+            raw, fh = _open_raw(self.path, self._compressed_in, self.read_size)
+            skip = self.offset
+            if skip and not is_compressed(self.path):
+                raw.seek(skip)
+                skip = 0
+            while not self._stop.is_set():
+                block = raw.read(self.read_size)
+                if not block:
+                    break
+                if skip:
+                    drop = min(skip, len(block))
+                    skip -= drop
+                    block = block[drop:]
+                    if not block:
+                        continue
+                self._queue.put(block)
+        except BaseException as e:
+            self._error = e
+        finally:
+            if raw is not None and raw is not fh:
+                raw.close()
+            if fh is not None:
+                fh.close()
+            self._queue.put(None)
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+        return self
+
+    def __iter__(self):
+        carry = b''
+        while True:
+            t = time.perf_counter()
+            block = self._queue.get()
+            self.wait_seconds += time.perf_counter() - t
+            if block is None:
+                break
+            self.bytes_out += len(block)
+            buf = io.BytesIO(carry + block if carry else block)
+            carry = b''
+            for line in buf:
+                if line.endswith(b'\n'):
+                    yield line
+                else:
+                    carry = line
+        if self._error is not None:
+            raise self._error
+        if carry:
+            yield carry
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        # unblock the producer if the parser stopped early
+        while self._thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                self._thread.join(0.05)
+        self.seconds = time.perf_counter() - self._t0
+        return False
+
+    def summary(self) -> str:
+        secs = max(self.seconds, 1e-9)
+        return (f"{self.bytes_in / 1e6:.1f} MB read at {self.bytes_in / 1e6 / secs:.1f} MB/s, "
+                f"{self.bytes_out / 1e6:.1f} MB parsed at {self.bytes_out / 1e6 / secs:.1f} MB/s, "
+                f"{100 * self.wait_seconds / secs:.0f}% of {secs:.1f}s waiting on I/O/decompression")
+
+
+def open_dump(path, offset: int = 0, read_size: int = READ_SIZE) -> DumpReader:
+    return DumpReader(path, offset, read_size)
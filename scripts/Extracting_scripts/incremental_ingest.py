@@ -0,0 +1,188 @@
+"""
+incremental_ingest.py
+
+Append-only refresh of a panel's daily aggregates.
+
+A checkpoint per stream ('post' or 'comment' of one panel) stores, for every
+dump file, the byte offset up to which complete lines have been folded, plus
+the last processed `created_utc` and the per-day partial aggregates.  The
+first-seen author table of both streams is the panel's shared AuthorStore,
+saved next to them.  A later run seeks straight to the stored offsets, folds
+only the new tail and reports which days changed; the panel is then rebuilt
+from the aggregates without touching the old bytes again.
+
+A file that shrank or whose first bytes changed (a re-delivered dump rather
+than an appended one) invalidates its stream's checkpoint and that stream is
+rebuilt from byte zero.  The same happens when a stream checkpoint was written
+against a different save of the author store (e.g. a crash between the two
+writes), so the two can never silently disagree, and when it was built with
+different settings (extras, bucket, dedup, author filter) than requested.  A
+trailing line without a newline is left for the next run, since the dump may
+still be being written.  The new tails of a stream's dumps are folded merged
+by `created_utc` (kway_merge.py), like a full build.
+"""
+import hashlib
+import json
+import os
+from contextlib import ExitStack
+
+from author_store import AuthorStore
+from data_quality import DataQuality, timestamp
+from dump_io import READ_SIZE, open_dump
+from json_projection import FieldProjector
+from kway_merge import MERGE_READ_SIZE, merge_dumps
+from buckets import bucket_starts
+from stream_aggregate import DailyAggregator, projected_fields
+
+HEAD_BYTES = 4096
+# settings of checkpoints written before the setting existed
+_DEFAULTS = {'extras': False, 'bucket': '1d', 'dedup': False, 'author_filter': None}
+
+
+def _head_digest(path, n: int) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read(n)).hexdigest()
+
+
+class StreamCheckpoint:
+    """Offsets and daily aggregates of one stream, persisted as JSON at `state_path`."""
+
+    def __init__(self, state_path, prefix: str, store: AuthorStore, extras: bool = False,
+                 bucket: str = '1d', dedup: bool = False, author_filter=None):
+        self.state_path = state_path
+        self.store = store
+        self.extras = extras
+        self.bucket = bucket
+        self.dedup = dedup
+        self.author_filter = author_filter
+        self.settings = {
+            'extras'        : extras,
+            'bucket'        : bucket,
+            'dedup'         : dedup,
+            'author_filter' : author_filter.signature() if author_filter is not None else None,
+        }
+        self.agg = DailyAggregator(prefix, store, extras, bucket, dedup, author_filter)
+        self.files = {}
+        self.last_created_utc = None
+        if not os.path.exists(state_path):
+            self.reset(prefix)
+            return
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state['store_generation'] != store.generation:
+            print(f"Checkpoint {state_path} was saved against another author store, rebuilding")
+            self.reset(prefix)
+            return
+        settings = state.get('settings', {})
+        changed = [k for k, v in self.settings.items() if settings.get(k, _DEFAULTS[k]) != v]
+        if changed:
+            print(f"Checkpoint {state_path} was built with other {', '.join(changed)}, rebuilding")
+            self.reset(prefix)
+            return
+        self.agg.days = {int(day): acc for day, acc in state['days'].items()}
+        self.agg.ups_float = state['ups_float']
+        self.agg.score_float = state.get('score_float', False)
+        if 'quality' in state:
+            self.agg.quality = DataQuality.from_dict(state['quality'])
+        self.files = state['files']
+        self.last_created_utc = state['last_created_utc']
+
+    def reset(self, prefix: str) -> None:
+        self.store.stream(prefix).clear()
+        self.store.stream(f'{prefix}_id').clear()
+        self.agg = DailyAggregator(prefix, self.store, self.extras, self.bucket, self.dedup,
+                                   self.author_filter)
+        self.files = {}
+        self.last_created_utc = None
+
+    def _still_appended(self, path) -> bool:
+        entry = self.files[path]
+        return (os.path.getsize(path) >= entry.get('size', entry['offset'])
+                and _head_digest(path, entry['head_len']) == entry['head'])
+
+    def fold(self, paths) -> set:
+        """Fold the unread tail of `paths`; returns the set of touched bucket numbers."""
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        paths = [os.fspath(p) for p in paths]
+        if any(p in self.files and not self._still_appended(p) for p in paths):
+            print(f"Checkpoint {self.state_path} no longer matches its dumps, rebuilding from scratch")
+            self.reset(self.agg.prefix)
+
+        projector = FieldProjector(projected_fields(self.agg.prefix, self.extras, self.dedup))
+        entries = []
+        for path in paths:
+            entry = self.files.get(path)
+            if entry is None:
+                head_len = min(HEAD_BYTES, os.path.getsize(path))
+                entry = self.files[path] = {'offset': 0, 'head_len': head_len,
+                                            'head': _head_digest(path, head_len)}
+            entries.append(entry)
+
+        touched = set()
+        offsets = [entry['offset'] for entry in entries]
+        read_size = READ_SIZE if len(paths) == 1 else MERGE_READ_SIZE
+        with ExitStack() as stack:
+            # offsets count decompressed bytes, so .zst/.gz deliveries work too
+            readers = [stack.enter_context(open_dump(path, offset, read_size))
+                       for path, offset in zip(paths, offsets)]
+            for _, i, line, obj in merge_dumps(readers, projector, self.agg.quality,
+                                               complete_only=True):
+                offsets[i] += len(line)
+                if obj is None:
+                    continue
+                day = self.agg.add_record(obj, i)
+                if day is not None:
+                    touched.add(day)
+                    self.last_created_utc = timestamp(obj['created_utc'])
+        for path, entry, offset in zip(paths, entries, offsets):
+            entry['offset'] = offset
+            entry['size'] = os.path.getsize(path)
+        return touched
+
+    def save(self) -> None:
+        state = {
+            'prefix'           : self.agg.prefix,
+            'store_generation' : self.store.generation,
+            'files'            : self.files,
+            'last_created_utc' : self.last_created_utc,
+            'ups_float'        : self.agg.ups_float,
+            'settings'         : self.settings,
+            'score_float'      : self.agg.score_float,
+            'quality'          : self.agg.quality.to_dict(),
+            'days'             : {str(day): acc for day, acc in self.agg.days.items()},
+        }
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)     # never leave a half-written checkpoint behind
+
+
+def aggregate_incremental(streams: dict, checkpoint_dir, name: str, extras: bool = False,
+                          bucket: str = '1d', dedup: tuple = (), author_filter=None) -> dict:
+    """Fold only new lines for every stream of one panel.
+
+    `streams` maps a prefix ('post', 'comment') to its dump path(s); streams
+    whose prefix is in `dedup` skip repeated Reddit ids.  Returns
+    {prefix: (aggregate frame, sorted touched bucket starts as Timestamps)}.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    store_path = os.path.join(checkpoint_dir, f"{name}_authors.npz")
+    store = AuthorStore.load(store_path) if os.path.exists(store_path) else AuthorStore()
+
+    checkpoints, touched = {}, {}
+    for prefix, paths in streams.items():
+        cp = checkpoints[prefix] = StreamCheckpoint(
+            os.path.join(checkpoint_dir, f"{name}_{prefix}.json"), prefix, store, extras, bucket,
+            prefix in dedup, author_filter)
+        touched[prefix] = cp.fold(paths)
+
+    # the store gets a new generation on save; stream checkpoints then record it
+    store.save(store_path)
+    for cp in checkpoints.values():
+        cp.save()
+
+    return {
+        prefix: (cp.agg.to_frame(), list(bucket_starts(sorted(touched[prefix]), bucket)))
+        for prefix, cp in checkpoints.items()
+    }
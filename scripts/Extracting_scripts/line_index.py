@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+line_index.py
+
+Line-offset index sidecar for plain JSONL dumps.
+
+`build_index` scans a dump once and writes `{dump}.idx.npz` next to it with
+the byte offset of every line, plus a coarse `created_utc` map: one sample
+every INDEX_STRIDE lines (and one at the end) holding the largest
+`created_utc` before it and the smallest one from it onwards.  With the index
+a tool can seek straight to a line range or a date range instead of streaming
+the file from the top, and parallel workers can split a dump into ranges with
+equal line counts (parallel_ingest.chunk_ranges uses it when present).
+
+The bounds in the time map are running max/min values, so a date-range
+lookup never misses a record even when a dump is only roughly sorted; it may
+return a few lines outside the range, which `iter_time` filters out.
+
+The index remembers the size and first bytes of the dump: a dump that was
+rewritten is re-indexed from scratch, one that was appended to is extended
+from where the previous index stopped.  A trailing line without a newline is
+not indexed.  Compressed dumps can't be seeked into and are not indexed.
+"""
+import argparse
+import os
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from dump_io import is_compressed
+from incremental_ingest import HEAD_BYTES, _head_digest
+from json_projection import FieldProjector
+
+INDEX_SUFFIX = ".idx.npz"
+INDEX_STRIDE = 1024          # lines per created_utc sample
+
+
+def index_path(path) -> str:
+    return os.fspath(path) + INDEX_SUFFIX
+
+
+class LineIndex:
+    """Offsets and created_utc samples of one dump, as loaded from its sidecar."""
+
+    def __init__(self, path, offsets, sample_lines, run_max, suffix_min, head):
+        self.path = os.fspath(path)
+        self.offsets = offsets            # int64, line i is [offsets[i], offsets[i + 1])
+        self.sample_lines = sample_lines  # 0, STRIDE, 2 * STRIDE, ... and the line count
+        self.run_max = run_max            # max created_utc over the lines before each sample
+        self.suffix_min = suffix_min      # min created_utc over the lines from each sample on
+        self.head = head
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def size(self) -> int:
+        """Bytes covered by the index (the dump up to its last complete line)."""
+        return int(self.offsets[-1])
+
+    def save(self) -> None:
+        tmp = index_path(self.path) + ".tmp.npz"
+        np.savez_compressed(tmp, offsets=self.offsets, sample_lines=self.sample_lines,
+                            run_max=self.run_max, suffix_min=self.suffix_min,
+                            head=np.array(self.head))
+        os.replace(tmp, index_path(self.path))
+
+    @classmethod
+    def load(cls, path) -> 'LineIndex':
+        data = np.load(index_path(path))
+        return cls(path, data['offsets'], data['sample_lines'], data['run_max'],
+                   data['suffix_min'], str(data['head']))
+
+    def matches(self) -> bool:
+        """True if the dump still starts with the indexed bytes (it may have been appended to)."""
+        return (os.path.getsize(self.path) >= self.size
+                and _head_digest(self.path, min(HEAD_BYTES, self.size)) == self.head)
+
+    def fresh(self) -> bool:
+        """True if the index covers every complete line of the dump."""
+        if not self.matches():
+            return False
+        tail = os.path.getsize(self.path) - self.size
+        if tail > 1 << 20:
+            return False
+        with open(self.path, 'rb') as f:
+            f.seek(self.size)
+            return b'\n' not in f.read(tail)
+
+    # ── lookups ──────────────────────────────────────────────────────────────
+    def line_range(self, start: int, stop: int) -> tuple:
+        """Byte range of lines [start, stop)."""
+        start, stop = min(max(start, 0), len(self)), min(stop, len(self))
+        return int(self.offsets[start]), int(self.offsets[max(start, stop)])
+
+    def time_range(self, since=None, until=None) -> tuple:
+        """Byte range holding every line with since <= created_utc < until (epoch seconds)."""
+        first, last = 0, len(self)
+        if since is not None:
+            # last sample before which every line is older than `since`
+            k = int(np.searchsorted(self.run_max, since, side='left')) - 1
+            first = int(self.sample_lines[max(k, 0)])
+        if until is not None:
+            # first sample from which every line is at least `until`
+            k = int(np.searchsorted(self.suffix_min, until, side='left'))
+            last = int(self.sample_lines[min(k, len(self.sample_lines) - 1)])
+        return self.line_range(first, last)
+
+    def split(self, n: int) -> list:
+        """At most `n` (start, end) byte ranges with (nearly) equal line counts."""
+        bounds = sorted({len(self) * k // n for k in range(n + 1)})
+        return [(int(self.offsets[a]), int(self.offsets[b])) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def iter_bytes(self, start: int, end: int):
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            pos = start
+            for line in f:
+                if pos >= end:
+                    break
+                pos += len(line)
+                yield line
+
+    def iter_lines(self, start: int, stop: int):
+        """Raw lines [start, stop) of the dump."""
+        return self.iter_bytes(*self.line_range(start, stop))
+
+    def iter_time(self, since=None, until=None):
+        """Raw lines with since <= created_utc < until; lines without created_utc are skipped."""
+        projector = FieldProjector(('created_utc',))
+        for line in self.iter_bytes(*self.time_range(since, until)):
+            t = projector.loads(line).get('created_utc')
+            if t is None:
+                continue
+            t = float(t)
+            if (since is None or t >= since) and (until is None or t < until):
+                yield line
+
+
+def build_index(path, stride: int = INDEX_STRIDE) -> LineIndex:
+    """Create, extend or reuse the sidecar index of `path` and return it."""
+    path = os.fspath(path)
+    if is_compressed(path):
+        raise ValueError(f"{path}: compressed dumps can't be seeked into, decompress it to index it")
+
+    old = LineIndex.load(path) if os.path.exists(index_path(path)) else None
+    if old is not None and not old.matches():
+        old = None                         # rewritten, not appended to: start over
+    offsets = array('q', [0]) if old is None else array('q', old.offsets.astype(np.int64).tobytes())
+    base = len(offsets) - 1                # lines already indexed
+
+    # scan only the lines past the old index
+    projector = FieldProjector(('created_utc',))
+    times = []
+    with open(path, 'rb') as f:
+        f.seek(offsets[-1])
+        pos = offsets[-1]
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            pos += len(line)
+            offsets.append(pos)
+            t = projector.loads(line).get('created_utc')
+            times.append(np.nan if t is None else float(t))
+    if old is not None and not times:
+        return old
+
+    n = len(offsets) - 1
+    tail = np.array(times, dtype='float64')
+    # running max before line j of the tail, and min from line j of the tail on
+    tail_max = np.concatenate([[-np.inf], np.maximum.accumulate(np.nan_to_num(tail, nan=-np.inf))])
+    tail_min = np.concatenate([np.minimum.accumulate(np.nan_to_num(tail, nan=np.inf)[::-1])[::-1],
+                               [np.inf]])
+
+    sample_lines = np.unique(np.append(np.arange(0, n, stride), n)).astype(np.int64)
+    kept = sample_lines[sample_lines <= base] if old is not None else sample_lines[:0]
+    fresh = sample_lines[len(kept):]
+    if old is not None:
+        at = np.searchsorted(old.sample_lines, kept)
+        old_max = old.run_max[-1]
+        run_max = np.concatenate([old.run_max[at], np.maximum(old_max, tail_max[fresh - base])])
+        suffix_min = np.concatenate([np.minimum(old.suffix_min[at], tail_min[0]), tail_min[fresh - base]])
+    else:
+        run_max, suffix_min = tail_max[fresh], tail_min[fresh]
+
+    index = LineIndex(path, np.frombuffer(offsets, dtype=np.int64).copy(), sample_lines,
+                      run_max, suffix_min, _head_digest(path, min(HEAD_BYTES, offsets[-1])))
+    index.save()
+    return index
+
+
+def load_index(path) -> LineIndex | None:
+    """The sidecar index of `path` if it exists and still matches the dump, else None."""
+    if not os.path.exists(index_path(path)):
+        return None
+    index = LineIndex.load(path)
+    return index if index.fresh() else None
+
+
+def _epoch(value: str) -> float:
+    return pd.Timestamp(value).timestamp()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Build line-offset sidecars and read ranges through them.")
+    p.add_argument("dumps", nargs="+", type=str, help="plain .jsonl dumps to index")
+    p.add_argument("--lines", help="print lines START:STOP of each dump")
+    p.add_argument("--since", help="print lines created at or after this date (e.g. 2021-01-27)")
+    p.add_argument("--until", help="... and before this date")
+    args = p.parse_args()
+
+    for dump in args.dumps:
+        index = build_index(dump)
+        print(f"{dump}: {len(index)} lines, {index.size / 1e6:.1f} MB indexed in {index_path(dump)}")
+        if args.lines:
+            start, stop = (int(x) if x else None for x in args.lines.split(':'))
+            for line in index.iter_lines(start or 0, len(index) if stop is None else stop):
+                print(line.decode('utf-8', 'replace'), end='')
+        elif args.since or args.until:
+            for line in index.iter_time(_epoch(args.since) if args.since else None,
+                                        _epoch(args.until) if args.until else None):
+                print(line.decode('utf-8', 'replace'), end='')
@@ -0,0 +1,52 @@
+"""
+panel_io.py
+
+Typed columnar output for the merged daily panel.
+
+`{name}.parquet` keeps the date as a DatetimeIndex and every column at an
+explicit dtype (int32 counts, float32 prices), so downstream stages
+(hyperparameters.rolling_ab, epidemic_model_raw.setup_hmm_priors, plot_data)
+load it without re-parsing dates and floats from text, and can read only the
+columns they need.  `{name}.csv` is still written as the plain-text export.
+
+Parquet needs the optional `pyarrow` package.
+"""
+import pandas as pd
+
+OUTPUT_FORMATS = ("parquet", "csv")
+
+
+def _dtype(col: str, series: pd.Series) -> str:
+    if col.endswith('_count'):
+        return 'int32'
+    if col in ('Close', 'Open'):
+        return 'float32'
+    if col.endswith(('_upvotes', '_score')):
+        # daily sums can outgrow int32 on the largest subreddits
+        return 'int64' if pd.api.types.is_integer_dtype(series) else 'float64'
+    return 'float64'
+
+
+def typed_panel(df: pd.DataFrame) -> pd.DataFrame:
+    """The panel indexed by date with the explicit column dtypes used on disk."""
+    panel = df.set_index('date')
+    return panel.astype({c: _dtype(c, panel[c]) for c in panel.columns})
+
+
+def write_panel(df: pd.DataFrame, name: str, formats=OUTPUT_FORMATS) -> list:
+    """Write the panel in each of `formats`; returns the paths written."""
+    written = []
+    for fmt in formats:
+        path = f"{name}.{fmt}"
+        if fmt == "csv":
+            df.to_csv(path, index=False)
+        elif fmt == "parquet":
+            try:
+                typed_panel(df).to_parquet(path)
+            except ImportError as e:
+                print(f"Skipping {path}: {e}")
+                continue
+        else:
+            raise ValueError(f"unknown panel format: {fmt}")
+        written.append(path)
+    return written
@@ -0,0 +1,117 @@
+"""
+parallel_ingest.py
+
+Parse one large JSONL dump on several cores.
+
+The file is split into newline-aligned byte ranges and each range is folded
+into its own per-day accumulators in a process pool.  Counts and upvote sums
+merge by addition, but first-time authors cannot be decided inside a chunk, so
+every worker also returns its author first-seen table (author -> day of first
+appearance within the chunk, in file order).  The tables are then replayed in
+file order: an author is counted once, on the day of their earliest appearance
+in the whole file, exactly as the sequential pass would count them regardless
+of which worker finishes first.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from author_store import AuthorStore
+from json_projection import FieldProjector
+from line_index import load_index
+from stream_aggregate import DailyAggregator, projected_fields
+
+
+class ChunkAggregator(DailyAggregator):
+    """Daily counts for one byte range; first-time authors are only recorded."""
+
+    def __init__(self, prefix: str, extras: bool = False, bucket: str = '1d',
+                 author_filter=None):
+        super().__init__(prefix, extras=extras, bucket=bucket, author_filter=author_filter)
+        self.first_seen = {}      # author -> day of first appearance in this chunk
+
+    def first_time(self, author, day) -> bool:
+        if author not in self.first_seen:
+            self.first_seen[author] = day
+        return False
+
+
+def chunk_ranges(path, n_chunks: int) -> list:
+    """Split `path` into at most `n_chunks` (start, end) ranges that begin on a line start."""
+    size = os.path.getsize(path)
+    index = load_index(path)
+    if index is not None and len(index):
+        # equal line counts rather than equal bytes (see line_index.py)
+        ranges = index.split(n_chunks)
+        ranges[-1] = (ranges[-1][0], size)    # keep a trailing partial line, like a plain read
+        return ranges
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for k in range(1, n_chunks):
+            # step back one byte so a boundary that already sits on a line start is kept
+            f.seek(max(size * k // n_chunks - 1, 0))
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def aggregate_range(path, prefix: str, start: int, end: int, extras: bool = False,
+                    bucket: str = '1d', author_filter=None) -> tuple:
+    """Fold the lines starting in [start, end).
+
+    Returns (days, first_seen, ups_float, score_float, quality).
+    """
+    agg = ChunkAggregator(prefix, extras, bucket, author_filter)
+    projector = FieldProjector(projected_fields(prefix, extras))
+    pos = start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        for line in f:
+            if pos >= end:
+                break
+            pos += len(line)
+            agg.add_line(line, projector)
+    return agg.days, agg.first_seen, agg.ups_float, agg.score_float, agg.quality
+
+
+def merge_chunks(results, prefix: str, store: AuthorStore | None = None,
+                 extras: bool = False, bucket: str = '1d') -> DailyAggregator:
+    """Combine chunk results, given in file order, into one DailyAggregator."""
+    merged = DailyAggregator(prefix, store, extras, bucket)
+    for days, first_seen, ups_float, score_float, quality in results:
+        merged.ups_float |= ups_float
+        merged.score_float |= score_float
+        merged.quality.merge(quality)
+        for day, chunk_acc in days.items():
+            acc = merged.days.get(day)
+            if acc is None:
+                acc = merged.days[day] = merged._blank[:]
+            # everything but the first-time count (index 2) merges by addition
+            for k, value in enumerate(chunk_acc):
+                if k != 2:
+                    acc[k] += value
+        # second merge step: the earliest chunk an author appears in decides the day
+        for author, day in first_seen.items():
+            if merged.seen.first_time(author):
+                merged.days[day][2] += 1
+    return merged
+
+
+def aggregate_jsonl_parallel(path, prefix: str, workers: int = os.cpu_count(),
+                             store: AuthorStore | None = None,
+                             extras: bool = False, bucket: str = '1d',
+                             author_filter=None) -> pd.DataFrame:
+    """Same frame as stream_aggregate.aggregate_jsonl, computed on `workers` processes."""
+    ranges = chunk_ranges(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(aggregate_range,
+                           [path] * len(ranges), [prefix] * len(ranges),
+                           [s for s, _ in ranges], [e for _, e in ranges],
+                           [extras] * len(ranges), [bucket] * len(ranges),
+                           [author_filter] * len(ranges))
+        merged = merge_chunks(results, prefix, store, extras, bucket)
+    return merged.to_frame()
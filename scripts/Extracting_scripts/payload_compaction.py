@@ -0,0 +1,93 @@
+"""
+payload_compaction.py
+
+Shrinks the per-subreddit payload processed_subreddits_AI.py sends to Gemini.
+
+A subreddit's `description` is its sidebar: often several KB of markdown
+tables, rule lists, links and HTML entities, none of which helps to tell
+whether the community is about one asset.  `compact_item`:
+
+  * turns markdown links and images into their text and drops bare URLs,
+  * strips markdown syntax (headers, emphasis, quotes, tables, list bullets,
+    code fences) and HTML entities / zero-width characters,
+  * collapses whitespace,
+  * truncates each text field at a word boundary to `max_chars`,
+  * drops `public_description` when it repeats the title, `description` when
+    it repeats `public_description`, and fields left empty.
+
+Token counts are estimated at ~4 characters per token, as elsewhere in the
+classifier.
+"""
+import html
+import json
+import re
+
+DESCRIPTION_CHARS = 600      # per text field, after stripping
+
+_IMAGE      = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+_LINK       = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_REF_LINK   = re.compile(r'^\s*\[[^\]]+\]:\s*\S+.*$', re.M)
+_URL        = re.compile(r'(?:https?://|www\.)\S+')
+_CODE_FENCE = re.compile(r'```.*?```', re.S)
+_LINE_MARKS = re.compile(r'^\s*(?:#{1,6}|>+|[-*+]\s|\d+\.\s)\s*', re.M)
+_RULE       = re.compile(r'^\s*(?:[-*_=]\s*){3,}$', re.M)
+_TABLE      = re.compile(r'^\s*\|?(?:\s*:?-+:?\s*\|)+\s*:?-*:?\s*$', re.M)
+_SYMBOLS    = re.compile(r'[*~`^|#]+|(?<!\w)_+|_+(?!\w)')
+_INVISIBLE  = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+_SPACE      = re.compile(r'\s+')
+_NORMAL     = re.compile(r'[\W_]+')
+
+
+def strip_markdown(text: str) -> str:
+    """Plain, single-spaced text of a markdown sidebar."""
+    text = _INVISIBLE.sub(' ', html.unescape(text))
+    text = _CODE_FENCE.sub(' ', text)
+    text = _REF_LINK.sub(' ', text)
+    text = _IMAGE.sub(r'\1', text)
+    text = _LINK.sub(r'\1', text)
+    text = _URL.sub(' ', text)
+    text = _TABLE.sub(' ', text)
+    text = _RULE.sub(' ', text)
+    text = _LINE_MARKS.sub('', text)
+    text = _SYMBOLS.sub(' ', text)
+    return _SPACE.sub(' ', text).strip()
+
+
+def truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(' ', 0, max_chars)
+    return text[:cut if cut > max_chars // 2 else max_chars].rstrip() + '…'
+
+
+def _same(a: str, b: str) -> bool:
+    return _NORMAL.sub('', a).lower() == _NORMAL.sub('', b).lower()
+
+
+def compact_item(item: dict, max_chars: int = DESCRIPTION_CHARS) -> dict:
+    """`item` with its text fields stripped, truncated and de-duplicated."""
+    out = {'display_name_prefixed': item.get('display_name_prefixed')}
+    title = truncate(strip_markdown(item.get('title') or ''), max_chars)
+    public = truncate(strip_markdown(item.get('public_description') or ''), max_chars)
+    description = truncate(strip_markdown(item.get('description') or ''), max_chars)
+    if public and title and _same(public, title):
+        public = ''
+    if description and public and _same(description, public):
+        description = ''
+    for key, value in (('title', title), ('description', description), ('public_description', public)):
+        if value:
+            out[key] = value
+    return out
+
+
+def payload_tokens(item: dict) -> int:
+    return len(json.dumps(item, ensure_ascii=False)) // 4
+
+
+def compact_items(items, max_chars: int = DESCRIPTION_CHARS, savings: dict | None = None):
+    """Yield compacted `items`; `savings` maps each name to its (tokens before, tokens after)."""
+    for item in items:
+        small = compact_item(item, max_chars)
+        if savings is not None:
+            savings[item.get('display_name_prefixed')] = (payload_tokens(item), payload_tokens(small))
+        yield small
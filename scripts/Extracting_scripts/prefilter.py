@@ -0,0 +1,186 @@
+"""
+prefilter.py
+
+Cheap local screen run before the Gemini classification in
+processed_subreddits_AI.py.
+
+Most of the 50,000 subreddits have nothing to do with a tradable asset, and
+each one costs prompt tokens.  `Prefilter.score` gives every subreddit a
+score from plain string matching:
+
+  * the subreddit name, split into words (`DRSyourGME` -> drs, your, gme),
+    against the asset names of asset_engagement_stats.csv and a few
+    finance word stems ("coin", "stock", ...)                         +3
+  * otherwise, a name word that is one of the tickers                  +1
+  * a `$TICKER` cashtag in the title or descriptions                   +3
+  * a known asset name in the text ("gamestop", "shiba inu")           +2
+  * a known ticker written in capitals in the text                     +1
+  * each distinct finance keyword in the text (up to three)            +1
+
+All keywords and asset names are compiled into one case-insensitive
+alternation, so the text of a subreddit is searched once whatever the size of
+the dictionary.  A ticker in the name stays below MIN_SCORE on its own, since
+many tickers are also plain words (r/cats, r/moon, r/hot); it needs a
+cashtag, asset name or keyword in the text as well.  Subreddits scoring at
+least `min_score` are sent to the model.  Of the rest a fixed fraction is
+sent anyway as an audit sample; the pick is a hash of the name, so the same
+subreddits are audited on every run and a resumed run makes the same choice.
+How many audited subreddits the model marks asset-specific estimates what
+the screen misses.
+
+The tickers and asset names come from asset_engagement_stats.csv, i.e. from
+an earlier run of the classifier this screen sits in front of, so an asset
+that run missed can never raise a subreddit's score; such subreddits only get
+through on cashtags and finance keywords.  The screen therefore trades recall
+for tokens in a way the dictionary cannot correct by itself, and it is off
+unless processed_subreddits_AI.py is run with `--prefilter`.  The audit is
+the guard: if audited subreddits come back asset-specific, the screen is
+dropping real ones and the run should be repeated without it.
+"""
+import csv
+import os
+import re
+import zlib
+
+ASSET_STATS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                           'asset_engagement_stats.csv')
+
+MIN_SCORE  = 2
+AUDIT_RATE = 0.05
+
+FINANCE_KEYWORDS = (
+    'stock', 'stocks', 'stonk', 'stonks', 'shares', 'shareholder', 'shareholders', 'ticker',
+    'nasdaq', 'nyse', 'otc', 'earnings', 'dividend', 'dividends', 'short squeeze',
+    'hedge fund', 'hedge funds', 'market cap', 'ipo', 'due diligence', 'price prediction',
+    'technical analysis', 'investor', 'investors', 'investing', 'invest', 'portfolio',
+    'day trading', 'swing trading', 'options trading', 'bullish', 'bearish', 'to the moon',
+    'diamond hands', 'crypto', 'cryptocurrency', 'cryptocurrencies', 'coin', 'coins', 'token',
+    'tokens', 'altcoin', 'altcoins', 'memecoin', 'blockchain', 'defi', 'hodl', 'staking',
+    'airdrop', 'mainnet', 'whitepaper', 'tokenomics',
+)
+# stems that mark a subreddit name on their own: r/SafeMoonCoin, r/AMCStock
+NAME_STEMS = ('coin', 'token', 'stock', 'stonk', 'crypto', 'shares', 'hodl')
+# tickers that are also everyday words; they only count as cashtags or capitals
+COMMON_WORDS = frozenset({
+    'one', 'link', 'dot', 'dash', 'taco', 'gone', 'bat', 'sos', 'hex', 'ark', 'gods', 'elon',
+    'pepe', 'amp', 'neo', 'ban', 'mayo', 'sloth', 'atom', 'erg', 'sc', 'bb', 'nok',
+})
+_CORPORATE = re.compile(r'\s*(\(.*?\)|\b(inc|corp|corporation|ltd|limited|plc|oyj|group|holdings?|'
+                        r'company|companies|co|incorporated|technologies|international)\b\.?)', re.I)
+_NAME_WORDS = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+_CASHTAG = re.compile(r'\$([A-Za-z]{1,6})\b')
+_CAPITALS = re.compile(r'\b[A-Z][A-Z0-9]{1,7}\b')
+
+
+def load_assets(path=ASSET_STATS) -> tuple:
+    """(tickers, asset names) from asset_engagement_stats.csv; the subreddit column is not read."""
+    tickers, names = set(), set()
+    if not os.path.exists(path):
+        return tickers, names
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = csv.reader(f)
+        next(rows, None)
+        for row in rows:
+            if len(row) < 2:
+                continue
+            tickers.add(row[0].strip().upper())
+            name = ' '.join(_CORPORATE.sub(' ', row[1]).split()).lower()
+            if len(name) >= 4:
+                names.add(name)
+    return tickers, names
+
+
+class Prefilter:
+    """Scores subreddits by ticker / asset name / finance keyword matches."""
+
+    def __init__(self, tickers=(), names=(), keywords=FINANCE_KEYWORDS,
+                 min_score: int = MIN_SCORE, audit_rate: float = AUDIT_RATE):
+        self.tickers = frozenset(t.upper() for t in tickers)
+        self.min_score, self.audit_rate = min_score, audit_rate
+        self._name_tickers = frozenset(t.lower() for t in self.tickers if len(t) >= 3) - COMMON_WORDS
+        self._name_words = frozenset(n.replace(' ', '') for n in names)
+        self._stems = tuple(NAME_STEMS) + tuple(n.replace(' ', '') for n in names if len(n) >= 6)
+        self._kind = {k: 'keyword' for k in keywords}
+        self._kind.update({n: 'asset' for n in names})
+        # longest first, so "bitcoin cash" is found rather than "bitcoin"
+        alternatives = sorted(self._kind, key=len, reverse=True)
+        self._text = re.compile(r'\b(?:' + '|'.join(map(re.escape, alternatives)) + r')\b', re.I) \
+            if alternatives else None
+
+    @classmethod
+    def from_stats(cls, path=ASSET_STATS, **kw) -> 'Prefilter':
+        tickers, names = load_assets(path)
+        return cls(tickers, names, **kw)
+
+    def score(self, item: dict) -> tuple:
+        """(score, reasons) of one subreddit payload."""
+        score, reasons = 0, []
+        name = (item.get('display_name_prefixed') or '')[2:]
+        words = {w.lower() for w in _NAME_WORDS.findall(name)}
+        lowered = name.lower()
+        hit = next(iter(words & self._name_words), None) \
+            or next((s for s in self._stems if s in lowered), None)
+        if hit:
+            score += 3
+            reasons.append(f'name:{hit}')
+        else:
+            ticker = next(iter(words & self._name_tickers), None)
+            if ticker:
+                score += 1
+                reasons.append(f'name_ticker:{ticker}')
+
+        text = ' '.join(filter(None, (item.get('title'), item.get('public_description'),
+                                      item.get('description'))))
+        if not text:
+            return score, reasons
+        tags = {t.upper() for t in _CASHTAG.findall(text)}
+        if tags:
+            score += 3
+            reasons.append('cashtag:' + '/'.join(sorted(tags)[:3]))
+        if self._text is not None:
+            found = {m.lower() for m in self._text.findall(text)}
+            assets = sorted(f for f in found if self._kind.get(f) == 'asset')
+            keywords = sorted(f for f in found if self._kind.get(f) == 'keyword')
+            if assets:
+                score += 2
+                reasons.append('asset:' + '/'.join(assets[:3]))
+            if keywords:
+                score += min(len(keywords), 3)
+                reasons.append('keywords:' + '/'.join(keywords[:3]))
+        capitals = self.tickers.intersection(_CAPITALS.findall(text)) - tags
+        if capitals:
+            score += 1
+            reasons.append('ticker:' + '/'.join(sorted(capitals)[:3]))
+        return score, reasons
+
+    def audited(self, item: dict) -> bool:
+        """True for the stable `audit_rate` sample of subreddits sent despite a low score."""
+        key = (item.get('display_name_prefixed') or '').encode('utf-8')
+        return zlib.crc32(key) % 10_000 < self.audit_rate * 10_000
+
+
+def screen(items, prefilter: Prefilter, rejected=None, stats: dict | None = None):
+    """Yield the candidates and the audit sample of `items`.
+
+    Rejected subreddits are written to the `rejected` CSV writer (name, score,
+    reasons) if one is given.  `stats` collects scored/candidates/audited/
+    rejected counts and the audited names under 'audit'.
+    """
+    stats = stats if stats is not None else {}
+    for key in ('scored', 'candidates', 'audited', 'rejected'):
+        stats.setdefault(key, 0)
+    stats.setdefault('audit', set())
+    for item in items:
+        stats['scored'] += 1
+        score, reasons = prefilter.score(item)
+        if score >= prefilter.min_score:
+            stats['candidates'] += 1
+            yield item
+        elif prefilter.audited(item):
+            stats['audited'] += 1
+            stats['audit'].add(item['display_name_prefixed'])
+            yield item
+        else:
+            stats['rejected'] += 1
+            if rejected is not None:
+                rejected.writerow([item['display_name_prefixed'], score, ' '.join(reasons)])
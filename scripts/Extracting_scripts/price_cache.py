@@ -0,0 +1,146 @@
+"""
+price_cache.py
+
+Persistent daily price store for the yfinance step of raw_data_to_csv.py.
+
+Prices are kept per ticker in `{cache_dir}/{ticker}.csv` (date, Close, Open,
+Volume), next to a `{ticker}.json` listing the date ranges already fetched.
+The ranges are stored separately from the rows because weekends and holidays
+have no rows but must not be re-requested either.  `PriceCache.get` only asks
+the provider for the parts of [start, end) that are not covered yet; with
+`offline=True` it never calls the provider and fails on a gap instead.
+yf.download answers network errors, rate limits and unknown tickers with an
+empty frame, so an empty answer only marks a range covered when the range has
+no weekdays (a weekend); otherwise it is asked for again on the next run.
+
+A provider is any callable `(ticker, start, end) -> DataFrame` indexed by date
+with Close/Open/Volume columns.  `yfinance_provider` is the network one;
+`LocalProvider` serves prices from CSV files on disk, so the pipeline can run
+and be tested without network access.
+"""
+import json
+import os
+
+import pandas as pd
+
+PRICE_COLUMNS = ['Close', 'Open', 'Volume']
+
+
+def yfinance_provider(ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    import yfinance as yf
+
+    prices = yf.download(ticker, start=start, end=end, auto_adjust=False)
+    # yf.download returned a MultiIndex (e.g. Price/Ticker), drop the extra level:
+    if isinstance(prices.columns, pd.MultiIndex):
+        prices.columns = prices.columns.get_level_values(0)
+    return prices
+
+
+class LocalProvider:
+    """Stand-in provider reading `{root}/{ticker}.csv` (date, Close, Open, Volume)."""
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        self.calls = []              # (ticker, start, end) of every request, for tests
+
+    def __call__(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        self.calls.append((ticker, start, end))
+        path = os.path.join(self.root, f"{ticker}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='date'))
+        prices = pd.read_csv(path, parse_dates=['date']).set_index('date')
+        return prices[(prices.index >= start) & (prices.index < end)]
+
+
+def _missing(covered: list, start: pd.Timestamp, end: pd.Timestamp) -> list:
+    """Sub-ranges of [start, end) not inside any of the sorted `covered` ranges."""
+    gaps, cursor = [], start
+    for lo, hi in covered:
+        if hi <= cursor:
+            continue
+        if lo >= end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo))
+        cursor = max(cursor, hi)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _merge(ranges: list) -> list:
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class PriceCache:
+    """Daily prices per ticker, fetched once per date range and replayed from disk."""
+
+    def __init__(self, cache_dir, provider=yfinance_provider, offline: bool = False):
+        self.cache_dir = os.fspath(cache_dir)
+        self.provider = provider
+        self.offline = offline
+        self.fetched_ranges = 0      # provider calls made by this cache
+
+    def _paths(self, ticker: str) -> tuple:
+        return (os.path.join(self.cache_dir, f"{ticker}.csv"),
+                os.path.join(self.cache_dir, f"{ticker}.json"))
+
+    def _load(self, ticker: str) -> tuple:
+        rows_path, ranges_path = self._paths(ticker)
+        if not os.path.exists(ranges_path):
+            return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='date')), []
+        with open(ranges_path, 'r', encoding='utf-8') as f:
+            covered = [(pd.Timestamp(lo), pd.Timestamp(hi)) for lo, hi in json.load(f)['covered']]
+        rows = pd.read_csv(rows_path, parse_dates=['date']).set_index('date')
+        return rows, covered
+
+    def _save(self, ticker: str, rows: pd.DataFrame, covered: list) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        rows_path, ranges_path = self._paths(ticker)
+        # rows first: a crash in between leaves extra rows, never an uncovered "covered" range
+        rows.to_csv(f"{rows_path}.tmp", index_label='date')
+        os.replace(f"{rows_path}.tmp", rows_path)
+        with open(f"{ranges_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'covered': [[lo.strftime('%Y-%m-%d'), hi.strftime('%Y-%m-%d')]
+                                   for lo, hi in covered]}, f)
+        os.replace(f"{ranges_path}.tmp", ranges_path)
+
+    def get(self, ticker: str, start, end) -> pd.DataFrame:
+        """Close/Open/Volume rows of `ticker` for dates in [start, end)."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        rows, covered = self._load(ticker)
+        gaps = _missing(covered, start, end)
+
+        if gaps and self.offline:
+            spans = ', '.join(f"{lo.date()}..{hi.date()}" for lo, hi in gaps)
+            raise LookupError(f"{ticker}: no cached prices for {spans} and the cache is offline")
+
+        if gaps:
+            # today's bar is still moving, so never mark it (or the future) as covered
+            today = pd.Timestamp.today().normalize()
+            fetched = [rows]
+            for lo, hi in gaps:
+                part = self.provider(ticker, lo, hi)
+                self.fetched_ranges += 1
+                if len(part):
+                    part = part[PRICE_COLUMNS]
+                    part.index = pd.DatetimeIndex(part.index).tz_localize(None).normalize()
+                    fetched.append(part[part.index < min(hi, today)])
+                elif len(pd.bdate_range(lo, min(hi, today), inclusive='left')):
+                    continue     # empty on weekdays: likely a failed download, retry next time
+                if lo < today:
+                    covered.append((lo, min(hi, today)))
+            nonempty = [f for f in fetched if len(f)]
+            if nonempty:
+                rows = pd.concat(nonempty)
+                rows = rows[~rows.index.duplicated(keep='last')].sort_index()
+                rows.index.name = 'date'
+            self._save(ticker, rows, _merge(covered))
+
+        return rows[(rows.index >= start) & (rows.index < end)]
@@ -1,23 +1,87 @@
 ##This script was created to find all forums related to specific assets after cleaning up all of the subreddits - all 20M subreddits have been filtered down to 50000 prior to this
-##This was done by removing all nsfw and private subreddits, and removing all subreddits with less than 3000 comments and 1500 posts.
+##This was done by removing all nsfw and private subreddits, and removing all subreddits with less than 3000 comments and 1500 posts. (subreddit_filter.py)
 ##This script utilized the google genai api with the model flash 2.0 and a custom was created after some initial testing of results 
 
-import os, json, time
+##Batches are sent concurrently (CONCURRENCY in flight) under a requests/tokens-per-minute token bucket,
+##and results are still written in input order.  The output CSV doubles as a ledger keyed by display_name_prefixed:
+##a re-run skips subreddits already in it, and subreddits a batch came back without are re-queued.
+##With --prefilter, a local keyword/ticker screen (prefilter.py) decides which subreddits reach the model; its dictionary
+##comes from an earlier classification run, so it is opt-in and its misses are estimated by the audit sample.
+##Sidebars are stripped of markdown and truncated (payload_compaction.py) before they are sent.
+
+import os, csv, json, time, argparse, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 from pydantic import BaseModel
 from google import genai
 from google.genai import types
 from google.genai.errors import APIError, ServerError
 
+from payload_compaction import DESCRIPTION_CHARS, compact_items
+from prefilter import AUDIT_RATE, MIN_SCORE, Prefilter, screen
+from response_cache import ResponseCache, cache_key
+
 # --- Configuration ---
 INPUT_FILE  = "subreddits_list/pre_processed_forums_AI.jsonl"
 OUTPUT_FILE = "subreddits_list/asset_specific_subreddits.csv"
-BATCH_SIZE  = 100
-SLEEP_SECONDS = 1
+CACHE_FILE  = "subreddits_list/response_cache.jsonl"   # per-subreddit results, see response_cache.py
+REJECTED_FILE = "subreddits_list/prefilter_rejected.csv"  # subreddits the local screen kept from the model
+BATCH_SIZE  = 200             # upper bound; batches are packed by token estimate, see pack_batches
+INPUT_TOKEN_BUDGET = 24_000   # subreddit payload tokens per request
+MAX_OUTPUT_TOKENS  = 8192
+OUTPUT_HEADROOM    = 0.75     # share of MAX_OUTPUT_TOKENS a packed batch is expected to fill
+MAX_SPLIT_DEPTH    = 4        # halvings of a truncated or short batch before leaving it to the requeue
+REQUEUE_ROUNDS = 3              # extra passes over subreddits a response left out
+MODEL       = "gemini-2.0-flash"
+CONCURRENCY = 8                 # batches in flight
+RPM_LIMIT   = 2000              # gemini-2.0-flash tier-1 quota; free tier is 15 RPM / 1M TPM
+TPM_LIMIT   = 4_000_000
+OUTPUT_TOKENS_PER_ITEM = 40     # rough size of one SubredditResult, counted against TPM up front
 
 # --- Initialize the GenAI client ---
-def init_client():
-    return genai.Client(api_key="putapikeyhere")
+def init_client(base_url: Optional[str] = None):
+    # base_url points the SDK at another generateContent endpoint, e.g. a local fake for benchmarks
+    http_options = types.HttpOptions(base_url=base_url) if base_url else None
+    return genai.Client(api_key=os.environ.get("GEMINI_API_KEY", "putapikeyhere"),
+                        http_options=http_options)
+
+# --- Rate Limiter ------------------------------------------------------------
+class RateLimiter:
+    """Token buckets for requests and tokens per minute, shared by all worker threads."""
+
+    def __init__(self, rpm: float = RPM_LIMIT, tpm: float = TPM_LIMIT,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rpm, self.tpm = rpm, tpm
+        self._clock, self._sleep = clock, sleep
+        self._requests, self._tokens = float(rpm), float(tpm)   # buckets start full
+        self._last = clock()
+        self._lock = threading.Lock()
+        self.waited = 0.0                                        # seconds spent blocked, all threads
+
+    def _refill(self, now: float) -> None:
+        elapsed, self._last = now - self._last, now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens   = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int) -> None:
+        """Block until one request carrying `tokens` tokens fits in both buckets."""
+        tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max((1 - self._requests) * 60 / self.rpm,
+                           (tokens - self._tokens) * 60 / self.tpm, 0.001)
+                self.waited += wait
+            self._sleep(wait)
+
+def estimate_tokens(sys_instr: str, user_json: str, n_items: int) -> int:
+    # ~4 characters per token for the prompt, plus the expected response
+    return (len(sys_instr) + len(user_json)) // 4 + OUTPUT_TOKENS_PER_ITEM * n_items
 
 # --- Schema Definition ---
 class SubredditResult(BaseModel):
@@ -26,14 +90,14 @@ class SubredditResult(BaseModel):
     identified_asset     : Optional[str]
     confidence_score     : float
 
-# --- Helper Functions (UNCHANGED) ------------------------------------------
+# --- Helper Functions ------------------------------------------------------
 def build_prompt(subreddits: List[dict]) -> tuple:
     system_instruction = (
-        # ------------- entire system instruction text UNCHANGED -------------
+        # ---- original system instruction, except that batches no longer hold a fixed 100 ----
         "You are an expert in identifying subreddits that are specifically and primarily dedicated to the discussion of a single financial asset.\n"
         "IMPORTANT: Financial assets are instruments that can be traded on a market.\n"
         "Examples of assets with subreddits include individual stocks (e.g., TSLA) or specific cryptocurrencies (e.g., Bitcoin). Exclude commodities such as (e.g., Gold).\n"
-        "The data is 50000 of the largest subreddits. This will be handed in batches of 100 at a time. - meaning there should be 100 results per batch\n"
+        "The data is 50000 of the largest subreddits. This will be handed in batches - there should be exactly one result per subreddit in the batch\n"
         "!IMPORTANT: Not all batches will include subreddits that relate to a financial asset. If none of the inputs in the batch relate to a financial asset, do not interpret this system instruction in another way.\n"
         "Celebrity names, topics or general items do not constitute as financial assets or single-instrument-focused assets.\n"
         "\n"
@@ -47,26 +111,41 @@ def build_prompt(subreddits: List[dict]) -> tuple:
         "CRITERIA:\n"
         "Primary Asset Focus: The subreddit name, title, description or public description must clearly focus on one asset.\n"
         "EXCLUDE GENERICS: Broad-market or multi-asset communities (like stocks, crypto, investing).\n"
-        "Evaluate each subreddit independently. You will be given a list of 100 subreddits per batch with display_name_prefixed, title, description and public description. Evaluate each subreddit independently.\n"
+        "Evaluate each subreddit independently. You will be given a list of subreddits per batch with display_name_prefixed, title, description and public description. Evaluate each subreddit independently.\n"
         "Asset Identification: If a subreddit is identified, attempt to extract the common name or ticker symbol of the specific asset (e.g., TSLA, Bitcoin, GME, XAU).\n"
         "Return exactly ONE output per subreddit that is strictly related to ONE financial asset. If the subreddit discusses multiple financial assets do not label this subreddit as true for identified asset.\n"
         "Return one schema/output per subreddit irregardless of results, e.g., if false - return false for is_asset_specific and null for identified_asset and confidence_score.\n"
         "INPUT: JSON array of objects with display_name_prefixed, title, description, public_description.\n"
         "OUTPUT: JSON array matching schema of SubredditResult (display_name_prefixed, is_asset_specific, identified_asset, confidence_score)."
     )
-    return system_instruction, json.dumps(subreddits, ensure_ascii=False)
+    # compact separators: the payload is counted against the token budget
+    return system_instruction, json.dumps(subreddits, ensure_ascii=False, separators=(',', ':'))
 
 # --- API Call WITH RETRY ONLY ----------------------------------------------
+class TruncatedResponse(Exception):
+    """The response hit max_output_tokens (or its JSON did not parse), so results were cut off."""
+
+def _truncated(resp) -> bool:
+    for cand in getattr(resp, "candidates", None) or []:
+        reason = getattr(cand, "finish_reason", None)
+        if getattr(reason, "name", reason) == "MAX_TOKENS":
+            return True
+    # a cut-off JSON array leaves text but nothing parsed
+    return resp.parsed is None and bool(getattr(resp, "text", None))
+
 def call_api(client, sys_instr: str, user_json: str,
-             retries: int = 5, backoff: float = 2.0) -> List[SubredditResult]:
+             retries: int = 5, backoff: float = 2.0,
+             limiter: Optional[RateLimiter] = None, tokens: int = 0) -> List[SubredditResult]:
     for attempt in range(retries):
+        if limiter is not None:
+            limiter.acquire(tokens)      # retries count against the quota too
         try:
             resp = client.models.generate_content(
-                model="gemini-2.0-flash",
+                model=MODEL,
                 contents=[user_json],
                 config=types.GenerateContentConfig(
                     system_instruction=sys_instr,
-                    max_output_tokens=8192,
+                    max_output_tokens=MAX_OUTPUT_TOKENS,
                     response_mime_type="application/json",
                     response_schema={
                         "type": "array",
@@ -74,87 +153,294 @@ def call_api(client, sys_instr: str, user_json: str,
                     },
                 )
             )
+            if _truncated(resp):
+                raise TruncatedResponse()
             return resp.parsed or []
         except (ServerError, APIError) as e:
-            if getattr(e, "status_code", 500) in (500, 502, 503, 504, 429):
+            # google.genai errors carry the HTTP status as `.code`
+            code = getattr(e, "code", 500)
+            if code in (500, 502, 503, 504, 429):
                 wait = backoff * (2 ** attempt)
-                print(f"⚠️  {e.status_code} – retry {attempt+1}/{retries} in {wait}s")
+                print(f"⚠️  {code} – retry {attempt+1}/{retries} in {wait}s")
                 time.sleep(wait)
             else:
                 raise
     raise RuntimeError("Exceeded retry limit")
 
-# --- Main Processing (UNCHANGED EXCEPT FOR CALL) ---------------------------
-def main():
-    client = init_client()
-
-    processed = 0
-    if os.path.exists(OUTPUT_FILE):
-        with open(OUTPUT_FILE, 'r', encoding='utf-8') as fout:
-            processed = sum(1 for _ in fout) - 1
-
-    mode = 'a' if processed else 'w'
-    with open(INPUT_FILE, 'r', encoding='utf-8') as infile, \
-         open(OUTPUT_FILE, mode, encoding='utf-8') as outfile:
-
-        if not processed:
-            outfile.write("display_name_prefixed,is_asset_specific,identified_asset,confidence_score\n")
-
-        for _ in range(processed):
-            next(infile, None)
-
-        batch, total, batch_no = [], processed, 0
-
-        for line in infile:
-            total += 1
-            data = json.loads(line)
-            batch.append({
-                'display_name_prefixed': data.get('display_name_prefixed'),
-                'title'               : data.get('title'),
-                'description'         : data.get('description'),
-                'public_description'  : data.get('public_description')
-            })
-
-            if len(batch) >= BATCH_SIZE:
-                batch_no += 1
-                print(f"Batch {batch_no}: processing {BATCH_SIZE} entries")
-                sys_i, user_j = build_prompt(batch)
-                results = call_api(client, sys_i, user_j)
-
-                if not results:
-                    print("❌ No results returned for this batch.")
-                else:
-                    for r in results:
-                        outfile.write(
-                            f"{r['display_name_prefixed']},"
-                            f"{r['is_asset_specific']},"
-                            f"{r.get('identified_asset', '')},"
-                            f"{r['confidence_score']}\n"
-                        )
-                    print(f"✅ Successfully processed {len(results)} entries.")
-
-                batch = []
-                time.sleep(SLEEP_SECONDS)
-
-        if batch:
-            batch_no += 1
-            print(f"Final batch {batch_no}: processing {len(batch)} entries")
-            sys_i, user_j = build_prompt(batch)
-            results = call_api(client, sys_i, user_j)
-
-            if not results:
-                print("❌ No results returned for final batch.")
-            else:
-                for r in results:
-                    outfile.write(
-                        f"{r['display_name_prefixed']},"
-                        f"{r['is_asset_specific']},"
-                        f"{r.get('identified_asset', '')},"
-                        f"{r['confidence_score']}\n"
-                    )
-                print(f"✅ Successfully processed final {len(results)} entries.")
+# --- Batch Processing -------------------------------------------------------
+def classify_batch(client, batch: List[dict], limiter: Optional[RateLimiter] = None,
+                   depth: int = 0) -> list:
+    """Results for `batch`; truncated or short responses are retried in halves."""
+    sys_i, user_j = build_prompt(batch)
+    try:
+        results = call_api(client, sys_i, user_j, limiter=limiter,
+                           tokens=estimate_tokens(sys_i, user_j, len(batch)))
+    except TruncatedResponse:
+        if len(batch) == 1 or depth >= MAX_SPLIT_DEPTH:
+            print(f"✂️  truncated response for {len(batch)} entries, giving up on them")
+            return []
+        print(f"✂️  truncated response – splitting {len(batch)} entries in two")
+        half = len(batch) // 2
+        return (classify_batch(client, batch[:half], limiter, depth + 1)
+                + classify_batch(client, batch[half:], limiter, depth + 1))
+
+    answered = {r['display_name_prefixed'] for r in results}
+    missing = [item for item in batch if item['display_name_prefixed'] not in answered]
+    if missing and len(missing) < len(batch) and depth < MAX_SPLIT_DEPTH:
+        # ask again for what was left out, in smaller requests
+        print(f"✂️  {len(missing)} of {len(batch)} entries missing – retrying them")
+        half = (len(missing) + 1) // 2
+        for part in (missing[:half], missing[half:]):
+            if part:
+                results = results + classify_batch(client, part, limiter, depth + 1)
+    return results
+
+def pack_batches(items, input_budget: int = INPUT_TOKEN_BUDGET,
+                 output_budget: int = int(MAX_OUTPUT_TOKENS * OUTPUT_HEADROOM),
+                 max_items: int = BATCH_SIZE):
+    """Group `items` in order into batches that fit the input and output token budgets.
+
+    A batch closes when the next subreddit would push its payload past
+    `input_budget` or its expected response past `output_budget`
+    (OUTPUT_TOKENS_PER_ITEM per subreddit), or at `max_items`.  A subreddit
+    larger than the input budget on its own is sent alone.
+    """
+    max_items = max(1, min(max_items, output_budget // OUTPUT_TOKENS_PER_ITEM))
+    batch, tokens = [], 0
+    for item in items:
+        cost = len(json.dumps(item, ensure_ascii=False)) // 4 + 1
+        if batch and (tokens + cost > input_budget or len(batch) >= max_items):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(item)
+        tokens += cost
+    if batch:
+        yield batch
+
+def write_results(outfile, results) -> None:
+    for r in results:
+        outfile.write(
+            f"{r['display_name_prefixed']},"
+            f"{r['is_asset_specific']},"
+            f"{r.get('identified_asset', '')},"
+            f"{r['confidence_score']}\n"
+        )
+
+def read_ledger(output_file: str) -> set:
+    """display_name_prefixed of every subreddit already in the output CSV."""
+    done = set()
+    if os.path.exists(output_file):
+        with open(output_file, 'r', encoding='utf-8') as fout:
+            next(fout, None)                                  # header
+            for line in fout:
+                name = line.split(',', 1)[0].strip()
+                if name:
+                    done.add(name)
+    return done
+
+def read_items(infile, done: set = frozenset()):
+    """Subreddits of the input JSONL not classified yet."""
+    for line in infile:
+        data = json.loads(line)
+        if data.get('display_name_prefixed') in done:
+            continue
+        yield {
+            'display_name_prefixed': data.get('display_name_prefixed'),
+            'title'               : data.get('title'),
+            'description'         : data.get('description'),
+            'public_description'  : data.get('public_description')
+        }
+
+def classify_stream(client, batches, outfile, ledger: set, concurrency: int = CONCURRENCY,
+                    limiter: Optional[RateLimiter] = None,
+                    cache: Optional[ResponseCache] = None,
+                    savings: Optional[dict] = None) -> dict:
+    """Classify `batches` with `concurrency` requests in flight.
+
+    Results are written in input order: a finished batch waits until every
+    batch before it has been written.  Each result is matched to its input by
+    display_name_prefixed and recorded in `ledger`; results for subreddits
+    that were not asked about (or already written) are dropped.  With a
+    `cache`, subreddits classified before under the same model and prompt are
+    served from it and only the rest of the batch is sent.  `savings` (see
+    payload_compaction.compact_items) adds the prompt tokens saved by
+    compaction to each batch's log line.
+
+    Returns counters and the list of inputs left without a result under 'missing'.
+    """
+    sys_instr = build_prompt([])[0]
+    stats = {'items': 0, 'batches': 0, 'written': 0, 'cached': 0, 'extra': 0, 'missing': []}
+    pending = deque()          # (batch number, batch, cached results, keys, future or None), oldest first
+
+    def flush_oldest():
+        no, batch, cached, keys, fut = pending.popleft()
+        fresh = fut.result() if fut is not None else []
+        by_name = {}
+        for r in fresh:
+            by_name.setdefault(r['display_name_prefixed'], r)
+        results, missing = [], []
+        for item in batch:
+            name = item['display_name_prefixed']
+            r = cached.get(name)
+            if r is None:
+                r = by_name.pop(name, None)
+                if r is not None and cache is not None:
+                    cache.put(keys[name], r)
+            if r is None:
+                missing.append(item)
+            elif name not in ledger:
+                ledger.add(name)
+                results.append(r)
+        extra = len(fresh) - (len(batch) - len(cached) - len(missing))
+        if cache is not None:
+            cache.flush()
+        write_results(outfile, results)
+        outfile.flush()
+        stats['written'] += len(results)
+        stats['cached'] += len(cached)
+        stats['extra'] += extra
+        stats['missing'] += missing
+        mark = "✅" if not missing else ("❌" if not results else "⚠️ ")
+        print(f"{mark} Batch {no}: {len(results)} of {len(batch)} entries written"
+              f" ({len(cached)} cached, {len(missing)} missing, {extra} unexpected).")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for batch in batches:
+            stats['batches'] += 1
+            stats['items'] += len(batch)
+            cached, keys, todo = {}, {}, batch
+            if cache is not None:
+                todo = []
+                for item in batch:
+                    name = item['display_name_prefixed']
+                    keys[name] = cache_key(MODEL, sys_instr, item)
+                    hit = cache.get(keys[name])
+                    if hit is not None:
+                        cached[name] = hit
+                    else:
+                        todo.append(item)
+            note = ""
+            if savings:
+                before, after = (sum(t) for t in zip(*(savings.get(item['display_name_prefixed'], (0, 0))
+                                                         for item in todo))) if todo else (0, 0)
+                note = f" (~{before} -> {after} payload tokens after compaction)"
+            print(f"Batch {stats['batches']}: processing {len(batch)} entries, {len(todo)} sent{note}")
+            fut = pool.submit(classify_batch, client, todo, limiter) if todo else None
+            pending.append((stats['batches'], batch, cached, keys, fut))
+            # bounded read-ahead; write whatever has finished at the head
+            while len(pending) >= 2 * concurrency or (
+                    pending and (pending[0][4] is None or pending[0][4].done())):
+                flush_oldest()
+        while pending:
+            flush_oldest()
+    return stats
+
+def audit_hits(output_file: str, names: set) -> set:
+    """The subreddits of `names` the output CSV marks asset-specific."""
+    with open(output_file, 'r', newline='', encoding='utf-8') as fout:
+        return {row[0] for row in csv.reader(fout)
+                if row and row[0] in names and row[1] == 'True'}
+
+# --- Main Processing --------------------------------------------------------
+def main(client=None, input_file: str = INPUT_FILE, output_file: str = OUTPUT_FILE,
+         concurrency: int = CONCURRENCY, rpm: float = RPM_LIMIT, tpm: float = TPM_LIMIT,
+         cache_file: Optional[str] = CACHE_FILE, requeue_rounds: int = REQUEUE_ROUNDS,
+         prefilter: Optional[Prefilter] = None, rejected_file: str = REJECTED_FILE,
+         batch_size: int = BATCH_SIZE, description_chars: Optional[int] = DESCRIPTION_CHARS):
+    client = client if client is not None else init_client()
+    limiter = RateLimiter(rpm, tpm)
+    cache = ResponseCache(cache_file) if cache_file else None
+    screened, rejected, savings = {}, None, {}
+
+    # the output CSV is the ledger: a subreddit is done once its row is written
+    ledger = read_ledger(output_file)
+    resumed = len(ledger)
+    if resumed:
+        print(f"Resuming: {resumed} subreddits already in {output_file}")
+
+    t0 = time.perf_counter()
+    batches = written = 0
+    try:
+        with open(input_file, 'r', encoding='utf-8') as infile, \
+             open(output_file, 'a' if os.path.exists(output_file) else 'w', encoding='utf-8') as outfile:
+
+            if outfile.tell() == 0:
+                outfile.write("display_name_prefixed,is_asset_specific,identified_asset,confidence_score\n")
+
+            todo = read_items(infile, ledger)
+            if prefilter is not None:
+                rejected = open(rejected_file, 'w', newline='', encoding='utf-8')
+                writer = csv.writer(rejected)
+                writer.writerow(['display_name_prefixed', 'score', 'reasons'])
+                todo = screen(todo, prefilter, writer, screened)
+            if description_chars:
+                todo = compact_items(todo, description_chars, savings)
+            for round_no in range(requeue_rounds + 1):
+                stats = classify_stream(client, pack_batches(todo, max_items=batch_size), outfile, ledger,
+                                        concurrency, limiter, cache, savings)
+                batches += stats['batches']
+                written += stats['written']
+                todo = stats['missing']
+                if stats['extra']:
+                    print(f"Dropped {stats['extra']} result(s) for subreddits not in their batch.")
+                if not todo:
+                    break
+                if round_no < requeue_rounds:
+                    print(f"Re-queueing {len(todo)} subreddit(s) without a result "
+                          f"(round {round_no + 1}/{requeue_rounds}).")
+    finally:
+        if cache is not None:
+            cache.close()
+        if rejected is not None:
+            rejected.close()
 
-    print(f"Done: Processed {total} lines in {batch_no} batches.")
+    secs = time.perf_counter() - t0
+    print(f"Done: wrote {written} subreddits in {batches} batches, {resumed + written} in total "
+          f"({secs:.1f}s, {batches / max(secs, 1e-9):.2f} batches/s, "
+          f"{limiter.waited:.1f}s waiting on the rate limiter).")
+    if todo:
+        print(f"❌ Still no result for {len(todo)} subreddit(s), e.g. "
+              f"{', '.join(item['display_name_prefixed'] for item in todo[:10])}; re-run to retry them.")
+    if savings:
+        before, after = (sum(t) for t in zip(*savings.values()))
+        print(f"Compaction: ~{before} -> {after} payload tokens for {len(savings)} subreddits "
+              f"({1 - after / max(before, 1):.0%} saved).")
+    if cache is not None:
+        print(cache.summary())
+    if prefilter is not None:
+        print(f"Prefilter: {screened['candidates']} of {screened['scored']} subreddits scored >= "
+              f"{prefilter.min_score}, {screened['audited']} audited, {screened['rejected']} kept "
+              f"from the model (listed in {rejected_file}).")
+        if screened['audited']:
+            missed = audit_hits(output_file, screened['audit'])
+            print(f"Audit: {len(missed)} of {screened['audited']} low-scoring subreddits classified "
+                  f"asset-specific{': ' + ', '.join(sorted(missed)[:10]) if missed else ''}.")
 
 if __name__ == '__main__':
-    main()
+    p = argparse.ArgumentParser(description="Classify subreddits as asset-specific with Gemini.")
+    p.add_argument("--input",       default=INPUT_FILE)
+    p.add_argument("--output",      default=OUTPUT_FILE)
+    p.add_argument("--concurrency", type=int,   default=CONCURRENCY, help="batches in flight")
+    p.add_argument("--batch-size",  type=int,   default=BATCH_SIZE,  help="most subreddits per request")
+    p.add_argument("--rpm",         type=float, default=RPM_LIMIT,   help="requests per minute")
+    p.add_argument("--tpm",         type=float, default=TPM_LIMIT,   help="tokens per minute")
+    p.add_argument("--base-url",    help="generateContent endpoint, e.g. a local fake server")
+    p.add_argument("--cache",       default=CACHE_FILE, help="per-subreddit response cache (JSONL)")
+    p.add_argument("--no-cache",    action="store_true", help="send every subreddit, ignoring the cache")
+    p.add_argument("--requeue-rounds", type=int, default=REQUEUE_ROUNDS,
+                   help="passes over subreddits left without a result")
+    p.add_argument("--description-chars", type=int, default=DESCRIPTION_CHARS,
+                   help="characters kept per text field after stripping markdown (0: send them raw)")
+    p.add_argument("--prefilter", action="store_true",
+                   help="screen subreddits locally and send only likely candidates plus an audit sample; "
+                        "the screen's dictionary comes from asset_engagement_stats.csv, so assets an "
+                        "earlier run missed can be dropped -- check the audit line")
+    p.add_argument("--min-score",   type=int,   default=MIN_SCORE,  help="prefilter score sent to the model")
+    p.add_argument("--audit-rate",  type=float, default=AUDIT_RATE,
+                   help="fraction of low-scoring subreddits sent anyway")
+    args = p.parse_args()
+    prefilter = Prefilter.from_stats(min_score=args.min_score, audit_rate=args.audit_rate) \
+        if args.prefilter else None
+    main(init_client(args.base_url), args.input, args.output, args.concurrency, args.rpm, args.tpm,
+         None if args.no_cache else args.cache, args.requeue_rounds, prefilter,
+         batch_size=args.batch_size, description_chars=args.description_chars)
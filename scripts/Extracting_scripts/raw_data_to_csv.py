@@ -1,90 +1,69 @@
+import os
+
 import pandas as pd
-import json
-import yfinance as yf
 import numpy as np
 
+from stream_aggregate import aggregate_jsonl
+from parallel_ingest import aggregate_jsonl_parallel
+from incremental_ingest import aggregate_incremental
+from kway_merge import aggregate_merged
+from author_store import AuthorStore
+from buckets import bucket_range
+from data_quality import write_report
+from dump_io import is_compressed
+from panel_io import write_panel
+from price_cache import PriceCache
+
 # Define stock ticker IMPORTANT (DO NOT FORGET)
 
 ticker = "AMD"
 jsonl_file_posts    = "data_raw/AMD/r_amd_stock_posts.jsonl"
 jsonl_file_comments = "data_raw/AMD/r_amd_stock_comments.jsonl"
+# either may also be a list, one dump per subreddit of the asset (see kway_merge.py)
 name = "AMD_data"
 
-# ── 1) Load & aggregate posts ──────────────────────────────────────────────────
-posts = []
-seen_posters = set()
-
-with open(jsonl_file_posts, 'r') as f:
-    for line in f:
-        obj = json.loads(line)
-        if 'created_utc' not in obj:
-            continue
-
-        date = pd.to_datetime(obj['created_utc'], unit='s').normalize()
-        ups   = obj.get('ups', 0)
-        ratio = obj.get('upvote_ratio', 1.0)
-        author = obj.get('author')
-
-        posts.append({
-            'date': date,
-            'ups': ups,
-            'first_time_post': int(author and author not in seen_posters)
-        })
-        if author and author not in seen_posters:
-            seen_posters.add(author)
-
-df_posts = pd.DataFrame(posts)
-posts_per_day = (
-    df_posts
-      .groupby('date')
-      .agg(
-          post_count            = ('ups',       'size'),
-          post_upvotes          = ('ups',       'sum'),
-          first_time_post_count = ('first_time_post','sum')
-      )
-      .reset_index()
-)
-
-# ── 2) Load & aggregate comments ─────────────────────────────────────────────
-comments = []
-seen_commenters = set()
-
-with open(jsonl_file_comments, 'r') as f:
-    for line in f:
-        obj = json.loads(line)
-        if 'created_utc' not in obj:
-            continue
-
-        date   = pd.to_datetime(obj['created_utc'], unit='s').normalize()
-        ups    = obj.get('ups',   0)
-        author = obj.get('author')
-
-        comments.append({
-            'date': date,
-            'ups': ups,
-            'first_time_comment': int(author and author not in seen_commenters)
-        })
-        if author and author not in seen_commenters:
-            seen_commenters.add(author)
-
-df_comments = pd.DataFrame(comments)
-comments_per_day = (
-    df_comments
-      .groupby('date')
-      .agg(
-          comment_count            = ('ups',   'size'),
-          comment_upvotes          = ('ups',   'sum'),
-          first_time_comment_count = ('first_time_comment','sum')
-      )
-      .reset_index()
-)
-
-# ── 3) Build full date index & zero‐fill posts/comments ────────────────────────
-start = min(posts_per_day['date'].min(), comments_per_day['date'].min())
-end   = max(posts_per_day['date'].max(), comments_per_day['date'].max())
-complete_date_range = pd.date_range(start=start, end=end, freq='D')
-
-def reindex_zero(df):
+# >1 splits each dump into newline-aligned byte ranges parsed in a process pool
+WORKERS = 1
+
+# True adds post_score, post_downvotes and comment_score (Old_scripts/extract_data.py's
+# extra features), summed in the same pass
+EXTRA_FEATURES = False
+
+# None keeps every author; author_filter.AuthorFilter() drops AutoModerator, [deleted] and known bots
+# (add regex rules with AuthorFilter(patterns=[...])), counted per rule in {name}_quality.json
+AUTHOR_FILTER = None
+
+# aggregation bucket: "1h", "4h", "1d" or "session" (NYSE trading days, see buckets.py)
+BUCKET = "1d"
+
+# a directory here keeps checkpoints, so reruns only fold newly appended lines
+CHECKPOINT_DIR = None
+
+# yfinance prices are cached here per ticker; only missing date ranges are downloaded
+PRICE_CACHE_DIR = "data_raw/prices"
+# True replays prices from the cache only and fails on a gap instead of downloading
+PRICE_OFFLINE = False
+
+
+def several(paths):
+    # a list of dumps (e.g. every subreddit of an asset) rather than a single path
+    return not isinstance(paths, (str, os.PathLike)) and len(paths) > 1
+
+
+def load_daily(paths, prefix, store, workers=None, extras=False, bucket="1d", author_filter=None):
+    # Every line is folded straight into per-bucket accumulators (see stream_aggregate.py)
+    workers = WORKERS if workers is None else workers
+    if several(paths):
+        # all subreddits of the asset, merged by created_utc; posts deduplicated by id
+        return aggregate_merged(paths, prefix, store, extras, bucket, dedup=(prefix == 'post'),
+                                author_filter=author_filter)
+    # byte ranges need a seekable plain file; compressed dumps stream on one core
+    if workers > 1 and isinstance(paths, str) and not is_compressed(paths):
+        return aggregate_jsonl_parallel(paths, prefix, workers, store, extras, bucket, author_filter)
+    return aggregate_jsonl(paths, prefix, store, extras, bucket, author_filter)
+
+
+def reindex_zero(df, complete_date_range):
     return (
         df
           .set_index('date')
@@ -93,43 +72,90 @@ def reindex_zero(df):
           .reset_index()
     )
 
-posts_per_day    = reindex_zero(posts_per_day)
-comments_per_day = reindex_zero(comments_per_day)
-
-# ── 4) Pull stock data from yfinance & fix the multi‐index issue ────────────────────
-amd = yf.download(
-    ticker,
-    start = complete_date_range.min(),
-    end   =(complete_date_range.max() + pd.Timedelta(days=1)),
-    auto_adjust=False
-)
-
-# yf.download returned a MultiIndex (e.g. Price/Ticker), drop the extra level:
-if isinstance(amd.columns, pd.MultiIndex):
-    amd.columns = amd.columns.get_level_values(0)
-
-close_prices = amd['Close'].to_numpy()
-open_prices  = amd['Open'].to_numpy()
-volumes      = amd['Volume'].to_numpy()
-
-dfYf = pd.DataFrame(
-    np.column_stack([close_prices, volumes, open_prices]),
-    columns=['Close','Volume','Open'],
-    index=amd.index
-)
-
-# align to full date range, filling non-trading days
-dfYf = dfYf.reindex(complete_date_range)
-dfYf[['Close','Volume','Open']] = dfYf[['Close','Volume','Open']].ffill().bfill()
-dfYf.reset_index(inplace=True)
-dfYf.rename(columns={'index':'date'}, inplace=True)
-
-# ── 5) Merge all three & export to CSV ─────────────────────────────────────────
-merged_df = (
-    posts_per_day
-      .merge(comments_per_day, on='date', how='inner')
-      .merge(dfYf,             on='date', how='inner')
-)
-
-merged_df.to_csv(f"{name}.csv", index=False)
-print(f"Wrote {merged_df.shape[0]} rows × {merged_df.shape[1]} cols to {name}.csv")
+
+def build_panel(ticker, posts_paths, comments_paths, name, workers=None, checkpoint_dir=None,
+                price_cache=None, extras=None, bucket=None, author_filter=None):
+    """Build the merged panel for one asset and write it to `{name}.parquet` / `{name}.csv`."""
+    checkpoint_dir = CHECKPOINT_DIR if checkpoint_dir is None else checkpoint_dir
+    extras = EXTRA_FEATURES if extras is None else extras
+    bucket = BUCKET if bucket is None else bucket
+    author_filter = AUTHOR_FILTER if author_filter is None else author_filter
+    if price_cache is None:
+        price_cache = PriceCache(PRICE_CACHE_DIR, offline=PRICE_OFFLINE)
+    if checkpoint_dir:
+        # ── 1+2) Fold only lines appended since the last run ──────────────────
+        daily = aggregate_incremental({'post': posts_paths, 'comment': comments_paths},
+                                      checkpoint_dir, os.path.basename(name), extras, bucket,
+                                      dedup=('post',) if several(posts_paths) else (),
+                                      author_filter=author_filter)
+        for prefix, (_, touched) in daily.items():
+            print(f"{prefix}s: {len(touched)} {bucket} bucket(s) updated from new lines")
+        posts_per_day, comments_per_day = daily['post'][0], daily['comment'][0]
+    else:
+        # one interned author table serves both passes
+        store = AuthorStore()
+
+        # ── 1) Stream & aggregate posts ────────────────────────────────────────
+        posts_per_day = load_daily(posts_paths, 'post', store, workers, extras, bucket, author_filter)
+
+        # ── 2) Stream & aggregate comments ─────────────────────────────────────
+        comments_per_day = load_daily(comments_paths, 'comment', store, workers, extras, bucket,
+                                      author_filter)
+
+    # counters collected while parsing (see data_quality.py), written next to the CSV
+    quality = {'post'    : posts_per_day.attrs.get('quality', {}),
+               'comment' : comments_per_day.attrs.get('quality', {})}
+
+    # ── 3) Build full bucket index & zero‐fill posts/comments ──────────────────
+    start = min(posts_per_day['date'].min(), comments_per_day['date'].min())
+    end   = max(posts_per_day['date'].max(), comments_per_day['date'].max())
+    complete_date_range = bucket_range(start, end, bucket)
+
+    posts_per_day    = reindex_zero(posts_per_day, complete_date_range)
+    comments_per_day = reindex_zero(comments_per_day, complete_date_range)
+
+    # ── 4) Pull stock data (price cache, yfinance only for missing ranges) ──────
+    prices = price_cache.get(
+        ticker,
+        start = complete_date_range.min(),
+        end   =(complete_date_range.max() + pd.Timedelta(days=1)),
+    )
+
+    close_prices = prices['Close'].to_numpy()
+    open_prices  = prices['Open'].to_numpy()
+    volumes      = prices['Volume'].to_numpy()
+
+    dfYf = pd.DataFrame(
+        np.column_stack([close_prices, volumes, open_prices]),
+        columns=['Close','Volume','Open'],
+        index=prices.index
+    )
+
+    # align to full date range, filling non-trading days; sub-daily buckets get their day's prices
+    days = complete_date_range.normalize()
+    dfYf = dfYf.reindex(pd.date_range(start=days.min(), end=days.max(), freq='D'))
+    dfYf[['Close','Volume','Open']] = dfYf[['Close','Volume','Open']].ffill().bfill()
+    dfYf = dfYf.reindex(days).set_axis(complete_date_range)
+    dfYf.reset_index(inplace=True)
+    dfYf.rename(columns={'index':'date'}, inplace=True)
+
+    # ── 5) Merge all three & export (typed Parquet + CSV, see panel_io.py) ──────
+    merged_df = (
+        posts_per_day
+          .merge(comments_per_day, on='date', how='inner')
+          .merge(dfYf,             on='date', how='inner')
+    )
+
+    written = write_panel(merged_df, name)
+    write_report(f"{name}_quality.json", quality)
+    written.append(f"{name}_quality.json")
+    print(f"Wrote {merged_df.shape[0]} rows × {merged_df.shape[1]} cols to {', '.join(written)}")
+    return merged_df
+
+
+def main():
+    build_panel(ticker, jsonl_file_posts, jsonl_file_comments, name)
+
+
+if __name__ == "__main__":
+    main()
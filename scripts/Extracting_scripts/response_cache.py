@@ -0,0 +1,91 @@
+"""
+response_cache.py
+
+On-disk cache of subreddit classifications for processed_subreddits_AI.py.
+
+Results are cached per subreddit, not per batch: the key of a subreddit is a
+SHA-256 over the model name, the system instruction and the subreddit's own
+JSON payload.  Changing the prompt or the model therefore misses every entry,
+while re-running after a crash, or after a few descriptions changed, only
+sends the subreddits whose key is new -- whatever batch they land in.
+
+Entries are appended to one JSONL file (`{"key": ..., "result": {...}}`) that
+is read into a dict on open; a later entry for the same key wins, and a
+truncated last line from an interrupted run is ignored and terminated, so
+the next entry starts on a line of its own.  Lines without a key or result
+are skipped.  `hits` / `misses` count the lookups so the run can report its
+hit rate.
+"""
+import hashlib
+import json
+import os
+
+
+def cache_key(model: str, system_instruction: str, item: dict) -> str:
+    h = hashlib.sha256()
+    for part in (model, system_instruction, json.dumps(item, ensure_ascii=False, sort_keys=True)):
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """Per-subreddit results keyed by `cache_key`, persisted in an append-only JSONL file."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.entries = {}
+        self.hits = self.misses = 0
+        terminated = True
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    terminated = line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict) and 'key' in entry and 'result' in entry:
+                        self.entries[entry['key']] = entry['result']
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if not terminated:
+            self._file.write('\n')
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str):
+        """The cached result for `key`, or None."""
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        self.entries[key] = result
+        self._file.write(json.dumps({'key': key, 'result': result}, ensure_ascii=False) + '\n')
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> 'ResponseCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return (f"response cache: {self.hits} hit(s), {self.misses} miss(es) "
+                f"({self.hit_rate:.1%} hit rate), {len(self)} entries in {self.path}")
@@ -0,0 +1,182 @@
+"""
+stream_aggregate.py
+
+Single-pass daily aggregation of a Reddit posts/comments JSONL dump.
+
+Each line is folded straight into per-day accumulators (count, upvote sum,
+first-time-author count) instead of being collected into a list of dicts and
+grouped afterwards, so memory is bounded by the number of days plus the
+compact author store (see author_store.py).  With `extras=True` the same pass
+also sums the score/downvote features Old_scripts/extract_data.py used to
+build with three more reads of each file.  Only the keys `projected_fields`
+names are decoded from each line (`created_utc`, `ups` and `author`, plus the
+extra-feature fields and `id` when those are on; see json_projection.py), and
+compressed dumps are read directly (dump_io.py).  The resulting frame is
+identical to the old `DataFrame(records).groupby('date').agg(...)` output of
+raw_data_to_csv.py.
+
+Buckets default to UTC days; `bucket='1h'`, `'4h'` or `'session'` aggregate
+the same way at other widths (see buckets.py).  The accumulators are still
+called `days` and keyed by bucket number.  With `dedup=True` a record whose
+Reddit `id` was already folded is skipped (see kway_merge.py).  Data-quality
+counters are collected along the way (data_quality.py) and returned in the
+frame's `attrs['quality']`.  An `author_filter` (author_filter.py) drops
+bot/deleted accounts before anything is counted.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from author_store import AuthorStore
+from buckets import SessionCalendar, bucket_starts, bucket_width
+from data_quality import DataQuality
+from dump_io import open_dump
+from json_projection import FieldProjector
+
+FIELDS = ('created_utc', 'ups', 'author')
+
+# extract_data.py's extra features: a record only counts towards them if it has
+# all of these fields (posts: score and downvotes, comments: score only)
+EXTRA_FIELDS = {
+    'post'    : ('ups', 'score', 'upvote_ratio'),
+    'comment' : ('ups', 'score'),
+}
+
+
+def extra_fields(prefix: str) -> tuple:
+    return EXTRA_FIELDS.get(prefix, ('ups', 'score'))
+
+
+def projected_fields(prefix: str, extras: bool = False, dedup: bool = False) -> tuple:
+    """The JSON keys a pass over `prefix` has to decode."""
+    fields = FIELDS
+    if extras:
+        fields += tuple(f for f in extra_fields(prefix) if f not in fields)
+    if dedup:
+        fields += ('id',)
+    return fields
+
+
+class DailyAggregator:
+    """Per-bucket (by default per-day) accumulators for one stream ('post' or 'comment')."""
+
+    def __init__(self, prefix: str, store: AuthorStore | None = None, extras: bool = False,
+                 bucket: str = '1d', dedup: bool = False, author_filter=None):
+        self.prefix = prefix
+        # bucket number since epoch -> [count, ups, first_time] (+ [score, downvotes] with extras)
+        self.days = {}
+        self.bucket = bucket
+        self.width = bucket_width(bucket)
+        self.sessions = SessionCalendar() if bucket == 'session' else None
+        # authors already counted as first-time; the store can be shared with the other stream
+        store = store if store is not None else AuthorStore()
+        self.seen = store.stream(prefix)
+        # ids share the store's name table, so they are persisted along with the authors
+        self.seen_ids = store.stream(f'{prefix}_id') if dedup else None
+        self.quality = DataQuality()
+        self.author_filter = author_filter
+        self.ups_float = False    # a null/float `ups` turns the pandas column into float64
+        self.extras = extras
+        self.extra_fields = extra_fields(prefix)
+        self.score_float = False
+        self._blank = [0, 0, 0, 0, 0.0] if extras else [0, 0, 0]
+
+    def add(self, created_utc, ups, author) -> int:
+        if type(created_utc) is not int:
+            created_utc = float(created_utc)
+        day = int(created_utc // self.width)
+        if self.sessions is not None:
+            day = self.sessions.label(created_utc, day)
+
+        acc = self.days.get(day)
+        if acc is None:
+            acc = self.days[day] = self._blank[:]
+        acc[0] += 1
+
+        if ups is None:
+            self.ups_float = True
+        else:
+            if type(ups) is float:
+                self.ups_float = True
+            acc[1] += ups
+
+        if author and self.first_time(author, day):
+            acc[2] += 1
+        return day
+
+    def first_time(self, author, day) -> bool:
+        return self.seen.first_time(author)
+
+    def add_line(self, line: bytes, projector: FieldProjector, source: int = 0):
+        """Decode and fold one raw line; returns its day number, or None if it was skipped."""
+        obj = self.quality.decode(projector, line)
+        if obj is None:
+            return None
+        return self.add_record(obj, source)
+
+    def add_record(self, obj: dict, source: int = 0):
+        """Fold one decoded record; returns its day number, or None if it was skipped."""
+        created_utc = self.quality.check(obj, source)
+        if created_utc is None:
+            return None
+        if self.author_filter is not None:
+            rule = self.author_filter.rule(obj.get('author'))
+            if rule is not None:
+                excluded = self.quality.excluded
+                excluded[rule] = excluded.get(rule, 0) + 1
+                return None
+        if self.seen_ids is not None:
+            record_id = obj.get('id')
+            if record_id is not None and not self.seen_ids.first_time(record_id):
+                self.quality.duplicate_ids += 1
+                return None
+        day = self.add(created_utc, obj.get('ups', 0), obj.get('author'))
+        if self.extras:
+            self.add_extras(day, obj)
+        return day
+
+    def add_extras(self, day: int, obj: dict) -> None:
+        values = [obj.get(f) for f in self.extra_fields]
+        if None in values:
+            return
+        acc = self.days[day]
+        score = obj['score']
+        if type(score) is float:
+            self.score_float = True
+        acc[3] += score
+        if 'upvote_ratio' in obj:
+            acc[4] += obj['ups'] - score * obj['upvote_ratio']
+
+    def to_frame(self) -> pd.DataFrame:
+        p = self.prefix
+        days = sorted(self.days)
+        cols = list(zip(*(self.days[d] for d in days))) or [()] * len(self._blank)
+        frame = pd.DataFrame({
+            'date'                  : bucket_starts(days, self.bucket),
+            f'{p}_count'            : np.array(cols[0], dtype='int64'),
+            f'{p}_upvotes'          : np.array(cols[1], dtype='float64' if self.ups_float else 'int64'),
+            f'first_time_{p}_count' : np.array(cols[2], dtype='int64'),
+        })
+        if self.extras:
+            frame[f'{p}_score'] = np.array(cols[3], dtype='float64' if self.score_float else 'int64')
+            if 'upvote_ratio' in self.extra_fields:
+                frame[f'{p}_downvotes'] = np.array(cols[4], dtype='float64')
+        frame.attrs['quality'] = self.quality.to_dict()
+        return frame
+
+
+def aggregate_jsonl(paths, prefix: str, store: AuthorStore | None = None,
+                    extras: bool = False, bucket: str = '1d',
+                    author_filter=None) -> pd.DataFrame:
+    """Stream one path (or several, in order) once and return one row per bucket with activity."""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    agg = DailyAggregator(prefix, store, extras, bucket, author_filter=author_filter)
+    projector = FieldProjector(projected_fields(prefix, extras))
+    for path in paths:
+        with open_dump(path) as reader:
+            for line in reader:
+                agg.add_line(line, projector)
+        print(f"{path}: {reader.summary()}")
+    return agg.to_frame()
@@ -26,54 +26,77 @@ if __name__ == "__main__":
     extract_true_subreddits()
 
 #############Appending the subreddits posts and comments to the existing data########################
+## The metadata file is one JSON object per subreddit (multi-GB).  It is joined to the CSVs on
+## display_name_prefixed with a hash set: each line only has its name pulled out with a bytes search,
+## and `_meta` is decoded just for the lines whose name is wanted.  Several CSVs share the one pass.
 
 import json
+import re
 
 # Input files
 true_subreddits_file = 'subreddits_list/true_asset_specific_subreddits.csv'
 posts_comments_file = 'subreddits_list/filtered_posts_comments_subreddits_nsfw_private.jsonl'  # Updated path with .jsonl extension
+ENRICH_FILES = [true_subreddits_file]   # e.g. add the true/false *_filter.csv lists to enrich them in the same pass
 
-def append_posts_comments_data():
-    # Read the true subreddits CSV file
-    df_subreddits = pd.read_csv(true_subreddits_file)
-    
-    # Create a dictionary to store posts and comments counts for each subreddit
+# subreddit names are [A-Za-z0-9_], so the value never holds an escaped quote
+_NAME = re.compile(rb'"display_name_prefixed"\s*:\s*"([^"\\]*)"')
+_META = re.compile(rb'"_meta"\s*:\s*')
+_decoder = json.JSONDecoder()
+
+def _line_name(line: bytes):
+    m = _NAME.search(line)
+    while m is not None and line[m.start() - 1:m.start()] == b'\\':   # inside an escaped string
+        m = _NAME.search(line, m.end())
+    return m.group(1).decode('utf-8') if m else None
+
+def _line_meta(line: bytes) -> dict:
+    """Decode only the `_meta` object of the line (the whole line if it can't be located)."""
+    m = _META.search(line)
+    if m is not None and line[m.start() - 1:m.start()] != b'\\':
+        text = line[m.end():].decode('utf-8')
+        meta, _ = _decoder.raw_decode(text)
+        if isinstance(meta, dict):
+            return meta
+    return json.loads(line).get('_meta', {})
+
+def collect_metrics(metadata_file, names: set) -> dict:
+    """{display_name_prefixed: {'num_posts', 'num_comments'}} for `names`, in one pass over the file."""
     subreddit_metrics = {}
-    
-    # Read the JSONL file line by line to avoid loading the entire file into memory
-    with open(posts_comments_file, 'r') as f:
+    with open(metadata_file, 'rb') as f:
         for line in f:
+            name = _line_name(line)
+            if name is None or name not in names:
+                continue
             try:
-                data = json.loads(line)
-                display_name_prefixed = data.get('display_name_prefixed')
-                
-                if display_name_prefixed and display_name_prefixed in df_subreddits['display_name_prefixed'].values:
-                    # Extract posts and comments metrics
-                    meta_data = data.get('_meta', {})
-                    num_posts = meta_data.get('num_posts', 0)
-                    num_comments = meta_data.get('num_comments', 0)
-                    
-                    # Store the metrics
-                    subreddit_metrics[display_name_prefixed] = {
-                        'num_posts': num_posts,
-                        'num_comments': num_comments
-                    }
-            except json.JSONDecodeError:
+                meta_data = _line_meta(line) or {}
+            except (ValueError, UnicodeDecodeError):
                 continue
-    
-    # Add the posts and comments data to the dataframe
-    df_subreddits['num_posts'] = df_subreddits['display_name_prefixed'].map(
-        lambda x: subreddit_metrics.get(x, {}).get('num_posts', 0)
-    )
-    df_subreddits['num_comments'] = df_subreddits['display_name_prefixed'].map(
-        lambda x: subreddit_metrics.get(x, {}).get('num_comments', 0)
-    )
-    
-    # Save the updated dataframe to the same CSV file
-    df_subreddits.to_csv(true_subreddits_file, index=False)
-    
-    print(f"Added posts and comments data to {len(subreddit_metrics)} subreddits")
-    print(f"Results saved to {true_subreddits_file}")
+            subreddit_metrics[name] = {
+                'num_posts': meta_data.get('num_posts', 0),
+                'num_comments': meta_data.get('num_comments', 0)
+            }
+    return subreddit_metrics
+
+def append_posts_comments_data(csv_files=ENRICH_FILES, metadata_file=posts_comments_file):
+    # Read every CSV to enrich and join them all against the metadata file at once
+    frames = {path: pd.read_csv(path) for path in csv_files}
+    names = set()
+    for df_subreddits in frames.values():
+        names.update(df_subreddits['display_name_prefixed'].dropna())
+
+    subreddit_metrics = collect_metrics(metadata_file, names)
+
+    for path, df_subreddits in frames.items():
+        # Add the posts and comments data to the dataframe
+        found = df_subreddits['display_name_prefixed'].map(subreddit_metrics)
+        df_subreddits['num_posts'] = found.map(lambda m: m['num_posts'] if isinstance(m, dict) else 0)
+        df_subreddits['num_comments'] = found.map(lambda m: m['num_comments'] if isinstance(m, dict) else 0)
+
+        # Save the updated dataframe to the same CSV file
+        df_subreddits.to_csv(path, index=False)
+
+        print(f"Added posts and comments data to {int(found.notna().sum())} subreddits")
+        print(f"Results saved to {path}")
 
 if __name__ == "__main__":
-    append_posts_comments_data()
\ No newline at end of file
+    append_posts_comments_data()
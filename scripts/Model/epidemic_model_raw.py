@@ -61,8 +61,12 @@ def initialize_markov_priors() -> Dict[str, Any]:
 
 def setup_hmm_priors(csv_path: Path, feature_col: str, window: int
                      ) -> pd.DataFrame:
-    df = pd.read_csv(csv_path, parse_dates=["date"]).set_index("date")
-    series = df[feature_col]
+    if Path(csv_path).suffix == ".parquet":
+        # columnar panel: read just the one feature, the date index comes with it
+        series = pd.read_parquet(csv_path, columns=[feature_col])[feature_col]
+    else:
+        df = pd.read_csv(csv_path, parse_dates=["date"]).set_index("date")
+        series = df[feature_col]
 
     ab = compute_ab(series, window=window)
     rows = []
@@ -80,7 +84,7 @@ def main():
     p = argparse.ArgumentParser(
         description="Compute σ₀,σ₁ and Markov‐priors for each rolling window."
     )
-    p.add_argument("csv",     type=Path, help="input CSV with 'date' + feature")
+    p.add_argument("csv",     type=Path, help="input panel (.parquet, or CSV with 'date') + feature")
     p.add_argument("--feature", type=str, required=True,
                    help="name of feature column (e.g. post_count)")
     p.add_argument("--window",  type=int, default=100,
@@ -12,11 +12,25 @@ _FEATURES = [
     "first_time_comment_count",
 ]
 
+def load_panel(path: Path | str) -> pd.DataFrame:
+    # typed Parquet panels already carry the date index; CSV is the text fallback
+    if Path(path).suffix == ".parquet":
+        import pyarrow.parquet as pq
+        # only ask for the columns the file has, so rolling_ab reports the missing ones
+        present = set(pq.read_schema(path).names)
+        return pd.read_parquet(path, columns=[c for c in _FEATURES if c in present])
+    return pd.read_csv(path, parse_dates=["date"]).set_index("date")
+
+
 def rolling_ab(csv_path: Path | str,
                window: int = 100,
                step: int = 1) -> pd.DataFrame:
-    df = (pd.read_csv(csv_path, parse_dates=["date"])
-            .set_index("date").asfreq("D").ffill())
+    df = load_panel(csv_path)
+    # (a,b) are per-day bounds; asfreq("D") would silently drop intraday rows
+    if not (df.index == df.index.normalize()).all() or not df.index.is_unique:
+        raise ValueError(f"{csv_path} is not a daily panel (rows must be one per date, "
+                         "e.g. the '1d' or 'session' bucket)")
+    df = df.asfreq("D").ffill()
 
     missing = [c for c in _FEATURES if c not in df.columns]
     if missing:
@@ -42,5 +56,8 @@ if __name__ == "__main__":
     p.add_argument("--out",    type=Path, required=True)
     args = p.parse_args()
 
-    rolling_ab(args.csv, args.window, args.step) \
-        .to_csv(args.out, index_label="window_end", float_format="%.2f")
+    ab = rolling_ab(args.csv, args.window, args.step)
+    if args.out.suffix == ".parquet":
+        ab.to_parquet(args.out)
+    else:
+        ab.to_csv(args.out, index_label="window_end", float_format="%.2f")
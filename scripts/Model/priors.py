@@ -44,7 +44,10 @@ def sample_sigma_stats(hyper_csv: Path | str,
     if seed is not None:
         np.random.seed(seed)
 
-    ab = pd.read_csv(hyper_csv, parse_dates=["window_end"])
+    if Path(hyper_csv).suffix == ".parquet":
+        ab = pd.read_parquet(hyper_csv).reset_index()
+    else:
+        ab = pd.read_csv(hyper_csv, parse_dates=["window_end"])
     if {"a_post_count", "b_post_count"} - set(ab.columns):
         raise ValueError("hyper_csv must contain a_post_count and b_post_count")
 
@@ -1,19 +1,24 @@
 import pandas as pd
-import json
+import os
+import sys
 from datetime import datetime
 import yfinance as yf
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Extracting_scripts'))
+from json_projection import FieldProjector
+
 jsonl_file_posts = "data_raw/SNDL/r_sndl_posts.jsonl"
 jsonl_file_comments = "data_raw/SNDL/r_sndl_comments.jsonl"
 
 ######################### - Reddit data - posts per day 
 posts = []
-with open(jsonl_file_posts, 'r') as f:
+projector = FieldProjector(('created_utc',))
+with open(jsonl_file_posts, 'rb') as f:
     for line in f:
-        obj = json.loads(line)
+        obj = projector.loads(line)
         if 'created_utc' in obj:
             posts.append({
                 'created_utc': obj['created_utc']
@@ -24,9 +29,10 @@ posts_per_day = df_posts.groupby('date').size().reset_index(name='post_count')
 
 ######################### - Reddit data - comments per day 
 comments = []
-with open(jsonl_file_comments, 'r') as f:
+projector = FieldProjector(('created_utc',))
+with open(jsonl_file_comments, 'rb') as f:
     for line in f:
-        obj = json.loads(line)
+        obj = projector.loads(line)
         if 'created_utc' in obj:
             comments.append({
                 'created_utc': obj['created_utc']
@@ -38,9 +44,10 @@ comments_per_day = df_comments.groupby('date').size().reset_index(name='comment_
 
 ######################### - Reddit data - upvotes on posts per day 
 votes_posts = []
-with open(jsonl_file_posts, 'r') as f:
+projector = FieldProjector(('created_utc', 'ups', 'score', 'upvote_ratio'))
+with open(jsonl_file_posts, 'rb') as f:
     for line in f:
-        obj = json.loads(line)
+        obj = projector.loads(line)
         if 'created_utc' in obj and 'ups' in obj and 'score' in obj and 'upvote_ratio' in obj:
             ups = obj['ups']
             score = obj['score']
@@ -67,9 +74,10 @@ score_per_day_posts = df_votes_posts.groupby('date')['score'].sum().reset_index(
 
 ######################### - Reddit data - upvotes on comments per day 
 votes_comments = []
-with open(jsonl_file_comments, 'r') as f:
+projector = FieldProjector(('created_utc', 'ups', 'score'))
+with open(jsonl_file_comments, 'rb') as f:
     for line in f:
-        obj = json.loads(line)
+        obj = projector.loads(line)
         if 'created_utc' in obj and 'ups' in obj and 'score' in obj:
             ups = obj['ups']
             score = obj['score']
@@ -89,10 +97,11 @@ score_per_day_comments = df_comments_posts.groupby('date')['score'].sum().reset_
 ######################### - Reddit data - first-time posts per day
 first_time_posters = []
 seen_posters = set()
+projector = FieldProjector(('author', 'created_utc'))
 
-with open(jsonl_file_posts, 'r') as f:
+with open(jsonl_file_posts, 'rb') as f:
     for line in f:
-        obj = json.loads(line)
+        obj = projector.loads(line)
         author = obj.get('author')
         created_utc = obj.get('created_utc')
         if author and created_utc and author not in seen_posters:
@@ -109,10 +118,11 @@ first_time_posting_per_day = df_first_time_posts.groupby('date').size().reset_in
 ######################### - Reddit data - first-time comments per day
 first_time_commenters = []
 seen_commenters = set()
+projector = FieldProjector(('author', 'created_utc'))
 
-with open(jsonl_file_comments, 'r') as f:
+with open(jsonl_file_comments, 'rb') as f:
     for line in f:
-        obj = json.loads(line)
+        obj = projector.loads(line)
         author = obj.get('author')
         created_utc = obj.get('created_utc')
         if author and created_utc and author not in seen_commenters:
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+benchmark_classifier.py
+
+Throughput benchmark for the subreddit classifier against the local fake
+endpoint (fake_gemini_server.py), so settings can be compared without API
+quota.
+
+For every combination of --concurrency and --batch-size the whole pipeline
+of processed_subreddits_AI.main runs against a fresh fake server (cache and
+prefilter off, output in a temporary directory).  Each generateContent call
+is timed on the client side.  Reported per run: subreddits/sec, requests,
+retries (injected 429/503 answers), truncated and short responses,
+subreddits still missing at the end, and p50/p95/p99 request latency.
+
+    python benchmark_classifier.py --subreddits 5000 --concurrency 1 4 8 16 \
+        --batch-size 50 100 200 --latency 0.8 --p429 0.02 --truncate 0.02
+
+Needs the google-genai package, like the classifier itself.  --input runs on
+a real pre_processed_forums_AI.jsonl instead of generated subreddits.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Extracting_scripts'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import processed_subreddits_AI as classifier
+from fake_gemini_server import ASSET_NAMES, FakeGemini
+
+WORDS = ('cats', 'gaming', 'news', 'pics', 'cooking', 'art', 'travel', 'music', 'tech', 'fitness',
+         'books', 'movies', 'cars', 'garden', 'science', 'history', 'memes', 'photo', 'diy', 'pets')
+
+
+class TimedModels:
+    """Wraps client.models and times every generate_content call."""
+
+    def __init__(self, models):
+        self._models = models
+        self._lock = threading.Lock()
+        self.latencies = []
+
+    def generate_content(self, **kw):
+        t0 = time.perf_counter()
+        try:
+            return self._models.generate_content(**kw)
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - t0)
+
+
+class TimedClient:
+    def __init__(self, client):
+        self.models = TimedModels(client.models)
+
+
+def synthetic_subreddits(path, n: int, seed: int = 0) -> None:
+    """`n` subreddits with sidebar-like description lengths; ~2% are named after an asset."""
+    rng = random.Random(seed)
+    assets = list(ASSET_NAMES)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n):
+            stem = rng.choice(assets) if rng.random() < 0.02 else rng.choice(WORDS)
+            words = int(rng.lognormvariate(4.0, 1.2))           # median ~55 words, long tail
+            f.write(json.dumps({
+                'display_name_prefixed': f'r/{stem}{i}',
+                'title': f'{stem.title()} community',
+                'description': ' '.join(rng.choice(WORDS) for _ in range(words)),
+                'public_description': f'All about {stem}',
+            }) + '\n')
+
+
+def run_once(input_file: str, concurrency: int, batch_size: int, fake_args: dict,
+             rpm: float, tpm: float) -> dict:
+    fake = FakeGemini(**fake_args)
+    url = fake.start()
+    client = TimedClient(classifier.init_client(url))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'out.csv')
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                classifier.main(client, input_file, output, concurrency, rpm, tpm,
+                                cache_file=None, prefilter=None, batch_size=batch_size)
+            secs = time.perf_counter() - t0
+            with open(output, encoding='utf-8') as f:
+                written = sum(1 for _ in f) - 1
+    finally:
+        fake.stop()
+    with open(input_file, encoding='utf-8') as f:
+        total = sum(1 for _ in f)
+    lat = np.array(client.models.latencies or [np.nan])
+    return {
+        'concurrency': concurrency, 'batch_size': batch_size, 'seconds': round(secs, 2),
+        'subreddits_per_s': round(written / secs, 1), 'requests': fake.stats['requests'],
+        'retries': fake.stats['429'] + fake.stats['503'], 'truncated': fake.stats['truncated'],
+        'short': fake.stats['dropped'],
+        'missing': total - written,
+        'p50_s': round(float(np.percentile(lat, 50)), 3),
+        'p95_s': round(float(np.percentile(lat, 95)), 3),
+        'p99_s': round(float(np.percentile(lat, 99)), 3),
+    }
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Benchmark the subreddit classifier against a fake endpoint.")
+    p.add_argument("--input", help="subreddit JSONL to classify (default: generated)")
+    p.add_argument("--subreddits", type=int, default=2000, help="generated subreddits")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    p.add_argument("--batch-size", type=int, nargs="+", default=[100])
+    p.add_argument("--rpm", type=float, default=classifier.RPM_LIMIT)
+    p.add_argument("--tpm", type=float, default=classifier.TPM_LIMIT)
+    p.add_argument("--latency", type=float, default=0.5)
+    p.add_argument("--jitter", type=float, default=0.25)
+    p.add_argument("--p429", type=float, default=0.0)
+    p.add_argument("--p503", type=float, default=0.0)
+    p.add_argument("--truncate", type=float, default=0.0)
+    p.add_argument("--drop", type=float, default=0.0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--csv", help="also write the result table here")
+    args = p.parse_args()
+
+    fake_args = dict(latency=args.latency, jitter=args.jitter, p429=args.p429, p503=args.p503,
+                     truncate=args.truncate, drop=args.drop, seed=args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = args.input
+        if input_file is None:
+            input_file = os.path.join(tmp, 'subreddits.jsonl')
+            synthetic_subreddits(input_file, args.subreddits, args.seed)
+        rows = []
+        for concurrency in args.concurrency:
+            for batch_size in args.batch_size:
+                row = run_once(input_file, concurrency, batch_size, fake_args, args.rpm, args.tpm)
+                rows.append(row)
+                print('  '.join(f"{k}={v}" for k, v in row.items()), flush=True)
+
+    if args.csv:
+        import pandas as pd
+        pd.DataFrame(rows).to_csv(args.csv, index=False)
+        print(f"Results saved to {args.csv}")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+fake_gemini_server.py
+
+Local stand-in for the Gemini generateContent endpoint, so the subreddit
+classifier (Extracting_scripts/processed_subreddits_AI.py) can be run and
+benchmarked without spending API quota.  It replaces the hand-written
+`call_flash_2_0_api` mock in first_gemini_script.py.
+
+Any POST to `.../models/<model>:generateContent` is answered with a JSON
+array holding one SubredditResult per subreddit in the request; a subreddit
+counts as asset-specific when its name contains one of a few well known
+tickers.  Failure modes are injected per request:
+
+  --latency / --jitter   seconds slept before answering (mean, +- uniform)
+  --p429 / --p503        share of requests answered RESOURCE_EXHAUSTED / UNAVAILABLE
+  --truncate             share of responses cut off with finishReason MAX_TOKENS
+  --drop                 share of responses leaving one subreddit out
+
+Responses longer than the request's maxOutputTokens (~4 characters per token)
+are truncated as the real service does.  GET /stats returns the counters.
+
+    python fake_gemini_server.py --port 8765 --latency 0.8 --p429 0.05
+    python processed_subreddits_AI.py --base-url http://127.0.0.1:8765 ...
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ASSET_NAMES = {'gme': 'GME', 'bitcoin': 'Bitcoin', 'btc': 'BTC', 'doge': 'DOGE',
+               'tsla': 'TSLA', 'amc': 'AMC', 'ethereum': 'ETH', 'cardano': 'ADA'}
+_ERRORS = {429: 'RESOURCE_EXHAUSTED', 503: 'UNAVAILABLE'}
+
+
+class FakeGemini:
+    """Failure-injection settings and counters shared by the request handlers."""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.25, p429: float = 0.0,
+                 p503: float = 0.0, truncate: float = 0.0, drop: float = 0.0, seed: int = 0):
+        self.latency, self.jitter = latency, jitter
+        self.p429, self.p503, self.truncate, self.drop = p429, p503, truncate, drop
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'subreddits': 0, '429': 0, '503': 0,
+                      'truncated': 0, 'dropped': 0}
+        self.server = None
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def _draw(self) -> tuple:
+        with self._lock:
+            return (self._random.random(), self._random.random(),
+                    self._random.uniform(-self.jitter, self.jitter))
+
+    @staticmethod
+    def classify(item: dict) -> dict:
+        name = item.get('display_name_prefixed') or ''
+        lowered = name.lower()
+        asset = next((a for key, a in ASSET_NAMES.items() if key in lowered), None)
+        return {'display_name_prefixed': name, 'is_asset_specific': asset is not None,
+                'identified_asset': asset, 'confidence_score': 0.9 if asset else 0.0}
+
+    def answer(self, request: dict) -> tuple:
+        """(HTTP status, response body) for one generateContent request."""
+        self._count('requests')
+        fail, cut, delta = self._draw()
+        time.sleep(max(self.latency + delta, 0.0))
+        if fail < self.p429 + self.p503:
+            code = 429 if fail < self.p429 else 503
+            self._count(str(code))
+            return code, {'error': {'code': code, 'message': f'injected {code}',
+                                    'status': _ERRORS[code]}}
+
+        text = ''.join(part.get('text', '') for content in request.get('contents', [])
+                       for part in content.get('parts', []))
+        try:
+            items = json.loads(text)
+        except ValueError:
+            items = []
+        self._count('subreddits', len(items))
+        results = [self.classify(item) for item in items if isinstance(item, dict)]
+        if results and cut < self.drop:
+            results.pop(self._random.randrange(len(results)))
+            self._count('dropped')
+        body = json.dumps(results)
+
+        reason = 'STOP'
+        limit = 4 * request.get('generationConfig', {}).get('maxOutputTokens', 8192)
+        if len(body) > limit or self.drop <= cut < self.drop + self.truncate:
+            body, reason = body[:min(limit, max(len(body) * 2 // 3, 1))], 'MAX_TOKENS'
+            self._count('truncated')
+        prompt_chars = len(text) + len(json.dumps(request.get('systemInstruction', '')))
+        return 200, {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': body}]},
+                            'finishReason': reason, 'index': 0}],
+            'usageMetadata': {'promptTokenCount': prompt_chars // 4,
+                              'candidatesTokenCount': len(body) // 4,
+                              'totalTokenCount': (prompt_chars + len(body)) // 4},
+        }
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Serve from a background thread; returns the base URL."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not re.search(r'/models/[^/]+:generateContent$', self.path.split('?')[0]):
+                    return self._send(404, {'error': {'code': 404, 'message': self.path,
+                                                      'status': 'NOT_FOUND'}})
+                self._send(*fake.answer(request))
+
+            def do_GET(self):
+                with fake._lock:
+                    stats = dict(fake.stats)
+                self._send(200, stats)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f'http://{host}:{self.server.server_address[1]}'
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Fake Gemini generateContent endpoint for local runs.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--latency", type=float, default=0.5, help="mean seconds per request")
+    p.add_argument("--jitter", type=float, default=0.25, help="+- uniform seconds around --latency")
+    p.add_argument("--p429", type=float, default=0.0, help="share of requests answered 429")
+    p.add_argument("--p503", type=float, default=0.0, help="share of requests answered 503")
+    p.add_argument("--truncate", type=float, default=0.0, help="share of responses cut off")
+    p.add_argument("--drop", type=float, default=0.0, help="share of responses missing a subreddit")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    fake = FakeGemini(args.latency, args.jitter, args.p429, args.p503, args.truncate, args.drop, args.seed)
+    url = fake.start(args.host, args.port)
+    print(f"Fake generateContent endpoint on {url} (stats at {url}/stats), Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(json.dumps(fake.stats))
+        fake.stop()
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
+import sys
 import glob
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -14,19 +15,33 @@ from plotly.subplots import make_subplots
 st.set_page_config(page_title="Interactive Data Visualization", layout="wide")
 st.title("Interactive Data Visualization")
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Extracting_scripts"))
+from asset_registry import REGISTRY_DB, AssetRegistry
+
 # Define path to data directory
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data_clean")
+REGISTRY_PATH = os.path.join(os.path.dirname(DATA_DIR), REGISTRY_DB)
+
+# Get list of data files: the typed Parquet panel if there is one, else the CSV
+# (batch_ingest.py's batch_summary.csv is a run report, not data)
+NOT_DATA = {"batch_summary.csv"}
 
-# Get list of CSV files
 @st.cache_data
 def get_csv_files():
-    csv_files = glob.glob(os.path.join(DATA_DIR, "*.csv"))
-    return [os.path.basename(file) for file in csv_files]
+    files = {}
+    for ext in (".csv", ".parquet"):
+        for file in glob.glob(os.path.join(DATA_DIR, f"*{ext}")):
+            if os.path.basename(file) not in NOT_DATA:
+                files[os.path.basename(file)[:-len(ext)]] = os.path.basename(file)
+    return sorted(files.values())
 
 # Load selected data file
 @st.cache_data
 def load_data(file_name):
     file_path = os.path.join(DATA_DIR, file_name)
+    if file_name.endswith(".parquet"):
+        # dtypes and the date index are stored with the file, nothing to parse
+        return pd.read_parquet(file_path).reset_index()
     df = pd.read_csv(file_path)
     # Convert date columns to datetime if they exist
     for col in df.columns:
@@ -34,6 +49,14 @@ def load_data(file_name):
             df[col] = pd.to_datetime(df[col])
     return df
 
+# Registry entry of the asset a panel belongs to (panels are named {ASSET}_data...)
+@st.cache_data
+def load_asset_info(file_name):
+    if not os.path.exists(REGISTRY_PATH):
+        return None
+    with AssetRegistry(REGISTRY_PATH) as registry:
+        return registry.asset(file_name.split("_data")[0])
+
 # File selection widget
 csv_files = get_csv_files()
 selected_file = st.sidebar.selectbox("Select Data File", csv_files)
@@ -45,13 +68,21 @@ if selected_file:
     # Display the dataframe
     st.subheader(f"Data Preview: {selected_file}")
     st.dataframe(df.head())
+
+    # Show the asset behind the panel
+    asset_info = load_asset_info(selected_file)
+    if asset_info:
+        st.sidebar.header(f"{asset_info['asset']}: {asset_info['true_name']}")
+        st.sidebar.write(f"{asset_info['asset_type']}, {asset_info['total_posts']:,} posts, "
+                         f"{asset_info['total_comments']:,} comments")
+        st.sidebar.caption(", ".join(asset_info['subreddits']))
     
     # Get column information
     st.sidebar.header("Plot Controls")
     
     # Identify date columns and numeric columns
     date_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
-    numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    numeric_columns = df.select_dtypes(include='number').columns.tolist()
     
     # If no date columns were found through type checking, try to find them by name
     if not date_columns:
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Extracting_scripts'))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def posts_path():
+    return os.path.join(FIXTURES, 'posts.jsonl')
+
+
+@pytest.fixture
+def comments_path():
+    return os.path.join(FIXTURES, 'comments.jsonl')
+
+
+def read_lines(path) -> list:
+    with open(path, 'rb') as f:
+        return f.readlines()
+
+
+def write_lines(path, lines) -> str:
+    with open(path, 'wb') as f:
+        f.writelines(lines)
+    return os.fspath(path)
+
+
+def baseline_groupby(lines, prefix: str = 'post') -> pd.DataFrame:
+    """The per-day aggregation of the original raw_data_to_csv.py, over raw JSONL lines.
+
+    Malformed lines and records whose created_utc is null or not a number are
+    dropped, as pd.to_datetime(..., errors='coerce') would turn them into NaT.
+    """
+    records, seen = [], set()
+    for line in lines:
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(obj, dict) or 'created_utc' not in obj:
+            continue
+        date = pd.to_datetime(obj['created_utc'], unit='s', errors='coerce')
+        if pd.isna(date):
+            continue
+        author = obj.get('author')
+        records.append({
+            'date': date.normalize(),
+            'ups': obj.get('ups', 0),
+            'first_time': int(bool(author) and author not in seen),
+        })
+        if author:
+            seen.add(author)
+    return (pd.DataFrame(records)
+              .groupby('date')
+              .agg(**{f'{prefix}_count'            : ('ups', 'size'),
+                      f'{prefix}_upvotes'          : ('ups', 'sum'),
+                      f'first_time_{prefix}_count' : ('first_time', 'sum')})
+              .reset_index())
+
+
+def assert_same_panel(frame: pd.DataFrame, expected: pd.DataFrame) -> None:
+    frame = frame.reset_index(drop=True)
+    frame['date'] = frame['date'].astype('datetime64[ns]')
+    expected = expected.copy()
+    expected['date'] = expected['date'].astype('datetime64[ns]')
+    pd.testing.assert_frame_equal(frame[expected.columns], expected, check_dtype=False)
@@ -0,0 +1,34 @@
+from author_filter import AuthorFilter
+from conftest import write_lines
+from stream_aggregate import aggregate_jsonl
+
+
+def test_names_then_patterns_in_order():
+    f = AuthorFilter(patterns=[r'(?i)bot$', r'^u_'])
+    assert f.rule('AutoModerator') == 'AutoModerator'
+    assert f.rule('CoolBot') == r'(?i)bot$'
+    assert f.rule('u_bot') == r'(?i)bot$'
+    assert f.rule('u_someone') == r'^u_'
+    assert f.rule('someone') is None
+    assert f.rule(None) is None
+
+
+def test_numbered_backreferences_stay_with_their_rule():
+    f = AuthorFilter(names=(), patterns=[r'^x', r'^(.)\1'])
+    assert f.rule('aaron') == r'^(.)\1'
+    assert f.rule('aron') is None
+
+
+def test_rules_may_reuse_group_names():
+    f = AuthorFilter(names=(), patterns=[r'^(?P<p>bot)_', r'_(?P<p>bot)$'])
+    assert f.rule('bot_a') == r'^(?P<p>bot)_'
+    assert f.rule('a_bot') == r'_(?P<p>bot)$'
+
+
+def test_dropped_records_are_counted_per_rule(tmp_path):
+    lines = [b'{"created_utc": 1609459200, "ups": 1, "author": "%s"}\n' % a
+             for a in (b'alice', b'AutoModerator', b'helperbot', b'bob', b'AutoModerator')]
+    frame = aggregate_jsonl(write_lines(tmp_path / 'p.jsonl', lines), 'post',
+                            author_filter=AuthorFilter(patterns=[r'bot$']))
+    assert frame['post_count'].tolist() == [2]
+    assert frame.attrs['quality']['excluded_authors'] == {'AutoModerator': 2, 'bot$': 1}
@@ -0,0 +1,65 @@
+import random
+import zlib
+
+from author_store import AuthorStore
+
+
+def names(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    pool = [f'user_{i}' for i in range(n // 2)] + ['Ünïcode_名前', '', '[deleted]']
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def test_seen_authors_behave_like_a_set():
+    store = AuthorStore(capacity=4)          # small, so the table grows many times
+    seen, reference = store.stream('post'), set()
+    for name in names(5000):
+        assert seen.first_time(name) == (name not in reference)
+        reference.add(name)
+    assert len(seen) == len(reference)
+    assert set(seen) == reference
+    assert all(name in seen for name in reference)
+    assert 'never_seen' not in seen
+
+
+def test_crc32_collisions_stay_distinct():
+    assert zlib.crc32(b'plumless') == zlib.crc32(b'buckeroo')
+    store = AuthorStore()
+    seen = store.stream('post')
+    assert seen.first_time('plumless')
+    assert seen.first_time('buckeroo')
+    assert not seen.first_time('plumless')
+    assert store.lookup('plumless') != store.lookup('buckeroo')
+
+
+def test_streams_share_ids_but_not_flags():
+    store = AuthorStore()
+    posts, comments = store.stream('post'), store.stream('comment')
+    assert posts.first_time('alice')
+    assert comments.first_time('alice')
+    assert 'alice' in posts and 'bob' not in comments
+    assert len(store) == 1
+
+
+def test_save_load_round_trip(tmp_path):
+    store = AuthorStore(capacity=8)
+    posts, comments = store.stream('post'), store.stream('comment')
+    for name in names(2000, seed=1) + ['user_0']:
+        posts.first_time(name)
+    for name in names(500, seed=2):
+        comments.first_time(name)
+    path = tmp_path / 'authors.npz'
+    store.save(path)
+
+    loaded = AuthorStore.load(path)
+    assert loaded.generation == store.generation
+    assert len(loaded) == len(store)
+    assert set(loaded.stream('post')) == set(posts)
+    assert set(loaded.stream('comment')) == set(comments)
+    assert all(loaded.lookup(store.name(i)) == i for i in range(len(store)))
+    # the loaded store keeps working, including growth past the saved table
+    new = loaded.stream('post')
+    assert not new.first_time('user_0')
+    for i in range(3000):
+        assert new.first_time(f'late_{i}')
+    assert new.first_time('user_0') is False
@@ -0,0 +1,65 @@
+import os
+import sys
+from datetime import date, datetime, timezone
+
+import pandas as pd
+import pytest
+
+from buckets import SessionCalendar
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'Model'))
+from hyperparameters import rolling_ab  # noqa: E402
+
+
+def day(d: str) -> int:
+    return (date.fromisoformat(d) - date(1970, 1, 1)).days
+
+
+def label(utc: str) -> int:
+    t = int(datetime.fromisoformat(utc).replace(tzinfo=timezone.utc).timestamp())
+    return SessionCalendar().label(t, t // 86400)
+
+
+@pytest.mark.parametrize('utc, session', [
+    # winter (EST): the 16:00 close is 21:00 UTC
+    ('2024-03-06T20:59:59', '2024-03-06'),
+    ('2024-03-06T21:00:00', '2024-03-07'),
+    ('2024-03-07T02:00:00', '2024-03-07'),      # Wednesday evening in New York
+    # Friday after the close and the whole weekend go to Monday
+    ('2024-03-08T21:00:00', '2024-03-11'),
+    ('2024-03-09T12:00:00', '2024-03-11'),
+    ('2024-03-10T23:59:59', '2024-03-11'),
+    # DST started on Sunday 2024-03-10: the close is 20:00 UTC
+    ('2024-03-11T19:59:59', '2024-03-11'),
+    ('2024-03-11T20:00:00', '2024-03-12'),
+    # DST ended on Sunday 2024-11-03: Friday closes at 20:00 UTC, Monday at 21:00
+    ('2024-11-01T19:59:59', '2024-11-01'),
+    ('2024-11-01T20:00:00', '2024-11-04'),
+    ('2024-11-03T20:30:00', '2024-11-04'),
+    ('2024-11-04T20:30:00', '2024-11-04'),
+    ('2024-11-04T21:00:00', '2024-11-05'),
+])
+def test_session_label_around_the_close(utc, session):
+    assert label(utc) == day(session)
+
+
+def test_session_close_is_cached_per_utc_day():
+    calendar = SessionCalendar()
+    t = day('2024-03-11') * 86400
+    for offset in (0, 3600, 20 * 3600, 86399):
+        calendar.label(t + offset, day('2024-03-11'))
+    assert list(calendar._close) == [day('2024-03-11')]
+
+
+def test_rolling_ab_rejects_intraday_panels(tmp_path):
+    frame = pd.DataFrame({c: range(6) for c in (
+        'post_count', 'post_upvotes', 'first_time_post_count',
+        'comment_count', 'comment_upvotes', 'first_time_comment_count')})
+    frame.insert(0, 'date', pd.date_range('2024-01-01', periods=6, freq='4h'))
+    frame.to_csv(tmp_path / 'X_data_4h.csv', index=False)
+    with pytest.raises(ValueError, match='not a daily panel'):
+        rolling_ab(tmp_path / 'X_data_4h.csv', window=2)
+
+    frame['date'] = pd.date_range('2024-01-01', periods=6, freq='D')
+    frame.to_csv(tmp_path / 'X_data.csv', index=False)
+    assert len(rolling_ab(tmp_path / 'X_data.csv', window=2)) == 4
@@ -0,0 +1,91 @@
+import io
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('google.genai')
+pytest.importorskip('pydantic')
+
+from processed_subreddits_AI import classify_stream, main  # noqa: E402
+
+
+class StubModels:
+    """Answers every subreddit it is sent, except those in `withhold` (for their first `times` asks),
+    and adds a repeated result plus one for a subreddit nobody asked about."""
+
+    def __init__(self, withhold=(), times=1):
+        self.withhold = set(withhold)
+        self.times = times
+        self.asked = {}
+        self.lock = threading.Lock()
+
+    def generate_content(self, model, contents, config):
+        results = []
+        for item in json.loads(contents[0]):
+            name = item['display_name_prefixed']
+            with self.lock:
+                self.asked[name] = n = self.asked.get(name, 0) + 1
+            if name in self.withhold and n <= self.times:
+                continue
+            results.append(result(name))
+        if results:
+            results.append(result(results[0]['display_name_prefixed'], asset='DUP'))
+        results.append(result('r/stranger'))
+        return SimpleNamespace(parsed=results, text=json.dumps(results), candidates=[])
+
+
+def result(name, asset='X'):
+    return {'display_name_prefixed': name, 'is_asset_specific': True,
+            'identified_asset': asset, 'confidence_score': 0.9}
+
+
+def item(name):
+    return {'display_name_prefixed': name, 'title': name[2:], 'description': '',
+            'public_description': ''}
+
+
+def test_classify_stream_reports_missing_and_drops_extra(capsys):
+    client = SimpleNamespace(models=StubModels(withhold={'r/c'}, times=99))
+    out, ledger = io.StringIO(), set()
+    stats = classify_stream(client, [[item('r/a'), item('r/b')], [item('r/c')]], out, ledger,
+                            concurrency=2)
+
+    assert out.getvalue() == 'r/a,True,X,0.9\nr/b,True,X,0.9\n'
+    assert ledger == {'r/a', 'r/b'}
+    assert [i['display_name_prefixed'] for i in stats['missing']] == ['r/c']
+    assert stats['written'] == 2
+    assert stats['extra'] == 3      # the repeated r/a and two r/stranger results
+
+
+def test_main_requeues_subreddits_left_without_a_result(tmp_path, capsys):
+    names = [f'r/s{i}' for i in range(6)]
+    infile = tmp_path / 'in.jsonl'
+    infile.write_text(''.join(json.dumps(item(n)) + '\n' for n in names), encoding='utf-8')
+    outfile = tmp_path / 'out.csv'
+    models = StubModels(withhold={'r/s1', 'r/s4'}, times=2)
+
+    main(SimpleNamespace(models=models), str(infile), str(outfile), concurrency=3,
+         cache_file=None, requeue_rounds=2, prefilter=None, batch_size=1, description_chars=0)
+
+    rows = outfile.read_text(encoding='utf-8').splitlines()
+    assert rows[0].startswith('display_name_prefixed,')
+    assert [r.split(',')[0] for r in rows[1:]] == ['r/s0', 'r/s2', 'r/s3', 'r/s5', 'r/s1', 'r/s4']
+    assert all(r.endswith(',X,0.9') for r in rows[1:])
+    assert models.asked['r/s1'] == models.asked['r/s4'] == 3
+    assert 'Re-queueing 2 subreddit(s)' in capsys.readouterr().out
+
+
+def test_main_gives_up_after_the_last_round(tmp_path, capsys):
+    infile = tmp_path / 'in.jsonl'
+    infile.write_text(''.join(json.dumps(item(n)) + '\n' for n in ('r/a', 'r/b')), encoding='utf-8')
+    outfile = tmp_path / 'out.csv'
+    models = StubModels(withhold={'r/b'}, times=99)
+
+    main(SimpleNamespace(models=models), str(infile), str(outfile), concurrency=1,
+         cache_file=None, requeue_rounds=1, prefilter=None, batch_size=1, description_chars=0)
+
+    assert outfile.read_text(encoding='utf-8').splitlines()[1:] == ['r/a,True,X,0.9']
+    assert models.asked['r/b'] == 2
+    assert 'Still no result for 1 subreddit(s), e.g. r/b' in capsys.readouterr().out
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from conftest import assert_same_panel, baseline_groupby, read_lines, write_lines
+from incremental_ingest import aggregate_incremental
+from kway_merge import aggregate_merged
+from parallel_ingest import aggregate_jsonl_parallel
+from stream_aggregate import aggregate_jsonl
+
+BAD_LINES = [
+    b'{"id": "b1", "created_utc": null, "ups": 5, "author": "zed"}\n',
+    b'{"id": "b2", "created_utc": "soon", "ups": 5, "author": "zed"}\n',
+    b'{"id": "b3", "ups": 5, "author": "zed"}\n',
+    b'{"id": "b4", "created_utc": 16094\n',
+    b'[1, 2, 3]\n',
+]
+
+
+def test_bad_records_are_counted_and_dropped(tmp_path, posts_path):
+    lines = read_lines(posts_path)
+    mixed = lines[:20] + BAD_LINES + lines[20:]
+    dump = write_lines(tmp_path / 'mixed.jsonl', mixed)
+    expected = baseline_groupby(lines)
+
+    frame = aggregate_jsonl(dump, 'post')
+    assert_same_panel(frame, expected)
+    quality = frame.attrs['quality']
+    assert quality['lines'] == len(mixed)
+    assert quality['bad_created_utc'] == 2
+    # the projection decoder only reads the wanted keys, so the JSON array counts as missing
+    assert quality['missing_created_utc'] == 2
+    assert quality['malformed_lines'] == 1
+    assert quality['out_of_order'] == 1
+
+    parallel = aggregate_jsonl_parallel(dump, 'post', 3)
+    pd.testing.assert_frame_equal(parallel, frame)
+    assert parallel.attrs['quality'] == quality
+
+    merged = aggregate_merged([dump], 'post')
+    assert_same_panel(merged, expected)
+
+    incremental, _ = aggregate_incremental({'post': dump}, tmp_path / 'cp', 'T')['post']
+    assert_same_panel(incremental, expected)
+
+
+def test_numeric_string_timestamps_are_kept(tmp_path):
+    lines = [b'{"created_utc": "1609459200", "ups": 1, "author": "a"}\n',
+             b'{"created_utc": 1609459300.5, "ups": 2, "author": "b"}\n']
+    frame = aggregate_jsonl(write_lines(tmp_path / 's.jsonl', lines), 'post')
+    assert frame['post_count'].tolist() == [2]
+    assert frame.attrs['quality']['bad_created_utc'] == 0
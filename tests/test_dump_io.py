@@ -0,0 +1,65 @@
+import bz2
+import gzip
+
+import pytest
+
+from conftest import read_lines
+from dump_io import open_dump
+
+
+def write_dump(path, data: bytes):
+    if path.suffix == '.gz':
+        data = gzip.compress(data)
+    elif path.suffix == '.bz2':
+        data = bz2.compress(data)
+    elif path.suffix == '.zst':
+        zstandard = pytest.importorskip('zstandard')
+        data = zstandard.ZstdCompressor().compress(data)
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture(params=['.jsonl', '.jsonl.gz', '.jsonl.bz2', '.jsonl.zst'])
+def suffix(request):
+    return request.param
+
+
+@pytest.mark.parametrize('read_size', [7, 64, 1 << 20])
+def test_lines_match_the_plain_file(tmp_path, posts_path, suffix, read_size):
+    lines = read_lines(posts_path)
+    # a trailing line without a newline is still returned
+    data = b''.join(lines) + b'{"partial": 1}'
+    dump = write_dump(tmp_path / f'posts{suffix}', data)
+    with open_dump(dump, read_size=read_size) as reader:
+        got = list(reader)
+    assert got == lines + [b'{"partial": 1}']
+    assert reader.bytes_out == len(data)
+
+
+def test_offset_skips_decompressed_bytes(tmp_path, posts_path, suffix):
+    lines = read_lines(posts_path)
+    data = b''.join(lines)
+    dump = write_dump(tmp_path / f'posts{suffix}', data)
+    offset = sum(len(line) for line in lines[:17])
+    for read_size in (5, 100, 1 << 20):
+        with open_dump(dump, offset, read_size) as reader:
+            assert list(reader) == lines[17:]
+    # an offset inside a line starts at that byte
+    with open_dump(dump, offset + 3, 50) as reader:
+        assert b''.join(reader) == data[offset + 3:]
+
+
+def test_stopping_early_closes_the_reader(tmp_path, posts_path, suffix):
+    dump = write_dump(tmp_path / f'posts{suffix}', open(posts_path, 'rb').read())
+    with open_dump(dump, read_size=16) as reader:
+        first = next(iter(reader))
+    assert first == read_lines(posts_path)[0]
+    assert not reader._thread.is_alive()
+
+
+def test_errors_reach_the_parser(tmp_path):
+    dump = tmp_path / 'broken.jsonl.gz'
+    dump.write_bytes(gzip.compress(b'{"a": 1}\n' * 100)[:-20])
+    with pytest.raises(EOFError):
+        with open_dump(dump) as reader:
+            list(reader)
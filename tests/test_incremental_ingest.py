@@ -0,0 +1,49 @@
+from conftest import assert_same_panel, baseline_groupby, read_lines, write_lines
+from incremental_ingest import aggregate_incremental
+
+
+def test_incremental_matches_full_build(tmp_path, posts_path):
+    lines = read_lines(posts_path)
+    dump = tmp_path / 'posts.jsonl'
+    checkpoints = tmp_path / 'checkpoints'
+
+    write_lines(dump, lines[:25])
+    frame, touched = aggregate_incremental({'post': dump}, checkpoints, 'T')['post']
+    assert_same_panel(frame, baseline_groupby(lines[:25]))
+    assert touched
+
+    # a trailing line without a newline is left for the next run
+    write_lines(dump, lines[:40] + [lines[40].rstrip(b'\n')])
+    frame, touched = aggregate_incremental({'post': dump}, checkpoints, 'T')['post']
+    assert_same_panel(frame, baseline_groupby(lines[:40]))
+    assert set(touched) <= set(frame['date'])
+
+    write_lines(dump, lines)
+    frame, _ = aggregate_incremental({'post': dump}, checkpoints, 'T')['post']
+    assert_same_panel(frame, baseline_groupby(lines))
+    frame, touched = aggregate_incremental({'post': dump}, checkpoints, 'T')['post']
+    assert touched == []
+    assert_same_panel(frame, baseline_groupby(lines))
+
+
+def test_incremental_shares_first_time_authors_across_runs(tmp_path, posts_path, comments_path):
+    posts, comments = read_lines(posts_path), read_lines(comments_path)
+    p, c = tmp_path / 'p.jsonl', tmp_path / 'c.jsonl'
+    write_lines(p, posts[:30])
+    write_lines(c, comments[:45])
+    aggregate_incremental({'post': p, 'comment': c}, tmp_path / 'cp', 'T')
+    write_lines(p, posts)
+    write_lines(c, comments)
+    daily = aggregate_incremental({'post': p, 'comment': c}, tmp_path / 'cp', 'T')
+    assert_same_panel(daily['post'][0], baseline_groupby(posts))
+    assert_same_panel(daily['comment'][0], baseline_groupby(comments, 'comment'))
+
+
+def test_incremental_rebuilds_a_redelivered_dump(tmp_path, posts_path):
+    lines = read_lines(posts_path)
+    dump = tmp_path / 'posts.jsonl'
+    write_lines(dump, lines)
+    aggregate_incremental({'post': dump}, tmp_path / 'cp', 'T')
+    write_lines(dump, lines[10:30])
+    frame, _ = aggregate_incremental({'post': dump}, tmp_path / 'cp', 'T')['post']
+    assert_same_panel(frame, baseline_groupby(lines[10:30]))
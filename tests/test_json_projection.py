@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from json_projection import FieldProjector
+
+FIELDS = ('created_utc', 'ups', 'author', 'score', 'id')
+
+LINES = [
+    # plain scalars, spacing variants, null/bool/float/exponent values
+    b'{"id": "a1", "created_utc": 1609459200, "ups": 5, "author": "alice"}',
+    b'{"created_utc":1609459200.5,"ups":-3,"author":null,"score":1e3}',
+    b'{"author" :  "bob" , "ups" : true, "created_utc": 0}',
+    b'{"ups": 7, "body": "a {brace} in text", "author": "c"}',
+    # key names appearing inside string values
+    b'{"body": "\\"ups\\": 99, \\"author\\": \\"x\\"", "ups": 1, "author": "real"}',
+    b'{"title": "ups", "ups": 2, "selftext": "created_utc", "created_utc": 3}',
+    b'{"author_flair_text": "ups: 5", "author": "d", "ups": 4}',
+    # keys inside nested objects and arrays before the top-level ones
+    b'{"preview": {"ups": 100, "author": "nested"}, "ups": 3, "author": "top"}',
+    b'{"crosspost_parent_list": [{"created_utc": 1, "ups": 9}], "created_utc": 2, "ups": 8}',
+    b'{"media": {}, "ups": 6, "gildings": {}, "author": "e"}',
+    b'{"all_awardings": [], "ups": [1, 2], "author": {"name": "f"}}',
+    # escapes, unicode and escaped quotes next to key names
+    b'{"author": "caf\\u00e9 \\"q\\"", "ups": 1, "id": "t3_\\/x"}',
+    b'{"body": "\\\\\\"ups\\": 5", "ups": 10}',
+    '{"author": "üñî", "ups": 0}'.encode('utf-8'),
+    # absent fields and a trailing newline
+    b'{"body": "nothing wanted here"}\n',
+    b'{}',
+]
+
+
+@pytest.mark.parametrize('line', LINES)
+def test_projection_matches_json_loads(line):
+    expected = {k: v for k, v in json.loads(line).items() if k in FIELDS}
+    projector = FieldProjector(FIELDS)
+    assert projector.loads(line) == expected
+    # a second call takes the search direction learned from the first
+    assert projector.loads(line) == expected
+
+
+def test_projection_takes_the_shortcut_on_flat_lines():
+    projector = FieldProjector(FIELDS)
+    projector.loads(LINES[0])
+    projector.loads(LINES[7])
+    assert (projector.fast_lines, projector.full_decodes) == (1, 1)
+
+
+def test_damaged_wanted_fields_raise_value_error():
+    # only the bytes of the wanted fields are validated (see data_quality.py)
+    projector = FieldProjector(FIELDS)
+    for line in (b'{"ups": 1, "author": ', b'not json', b'{"ups": 1x, "id": "2"}'):
+        with pytest.raises(ValueError):
+            projector.loads(line)
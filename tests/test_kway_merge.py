@@ -0,0 +1,29 @@
+import json
+
+from conftest import assert_same_panel, baseline_groupby, read_lines, write_lines
+from kway_merge import aggregate_merged
+
+
+def sorted_lines(path) -> list:
+    return sorted(read_lines(path), key=lambda l: json.loads(l)['created_utc'])
+
+
+def test_kway_merge_matches_one_sorted_dump(tmp_path, posts_path):
+    lines = sorted_lines(posts_path)
+    a = write_lines(tmp_path / 'a.jsonl', lines[0::3])
+    b = write_lines(tmp_path / 'b.jsonl', [l for i, l in enumerate(lines) if i % 3])
+    c = write_lines(tmp_path / 'c.jsonl', [])
+
+    merged = aggregate_merged([a, b, c], 'post')
+    assert_same_panel(merged, baseline_groupby(lines))
+    assert merged.attrs['quality']['out_of_order'] == 0
+
+
+def test_kway_merge_dedup_skips_repeated_ids(tmp_path, posts_path):
+    lines = sorted_lines(posts_path)
+    a = write_lines(tmp_path / 'a.jsonl', lines)
+    b = write_lines(tmp_path / 'b.jsonl', lines[10:40])
+
+    merged = aggregate_merged([a, b], 'post', dedup=True)
+    assert_same_panel(merged, baseline_groupby(lines))
+    assert merged.attrs['quality']['duplicate_ids'] == 30
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+
+from conftest import read_lines, write_lines
+from line_index import build_index, load_index
+
+
+def created(line) -> float:
+    return float(json.loads(line)['created_utc'])
+
+
+def test_build_index_extends_an_appended_dump(tmp_path, posts_path):
+    lines = read_lines(posts_path)
+    dump = write_lines(tmp_path / 'p.jsonl', lines[:25])
+    first = build_index(dump, stride=8)
+    assert len(first) == 25
+
+    with open(dump, 'ab') as f:
+        f.writelines(lines[25:])
+        f.write(b'{"created_utc": 1')              # unfinished last line is left out
+    extended = build_index(dump, stride=8)
+    scratch = build_index(write_lines(tmp_path / 'q.jsonl', lines), stride=8)
+
+    assert len(extended) == len(lines)
+    np.testing.assert_array_equal(extended.offsets, scratch.offsets)
+    np.testing.assert_array_equal(extended.sample_lines, scratch.sample_lines)
+    np.testing.assert_array_equal(extended.run_max, scratch.run_max)
+    np.testing.assert_array_equal(extended.suffix_min, scratch.suffix_min)
+    assert list(extended.iter_lines(0, len(lines))) == lines
+
+
+def test_rewritten_dump_is_reindexed(tmp_path, posts_path):
+    lines = read_lines(posts_path)
+    dump = write_lines(tmp_path / 'p.jsonl', lines)
+    build_index(dump, stride=8)
+    write_lines(dump, lines[::-1])
+    assert load_index(dump) is None
+    assert list(build_index(dump, stride=8).iter_lines(0, 5)) == lines[::-1][:5]
+
+
+def test_time_range_holds_every_line_in_range(tmp_path, posts_path):
+    lines = read_lines(posts_path)             # roughly, not strictly, sorted
+    index = build_index(write_lines(tmp_path / 'p.jsonl', lines), stride=4)
+    times = sorted(created(l) for l in lines)
+    since, until = times[len(times) // 4], times[3 * len(times) // 4]
+
+    start, end = index.time_range(since, until)
+    covered = list(index.iter_bytes(start, end))
+    wanted = [l for l in lines if since <= created(l) < until]
+    assert all(l in covered for l in wanted)
+    assert len(covered) < len(lines)
+    assert list(index.iter_time(since, until)) == wanted
+    assert index.time_range() == (0, index.size)
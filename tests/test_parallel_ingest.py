@@ -0,0 +1,29 @@
+import pandas as pd
+
+from conftest import read_lines, write_lines
+from parallel_ingest import aggregate_jsonl_parallel, chunk_ranges
+from stream_aggregate import aggregate_jsonl
+
+
+def test_chunk_ranges_cover_file_on_line_starts(posts_path):
+    data = open(posts_path, 'rb').read()
+    for n in (1, 2, 3, 7):
+        ranges = chunk_ranges(posts_path, n)
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+        assert all(data[start - 1:start] == b'\n' for start, _ in ranges[1:])
+
+
+def test_parallel_matches_sequential(posts_path):
+    expected = aggregate_jsonl(posts_path, 'post')
+    for workers in (2, 3, 7):
+        frame = aggregate_jsonl_parallel(posts_path, 'post', workers)
+        pd.testing.assert_frame_equal(frame, expected)
+        assert frame.attrs['quality'] == expected.attrs['quality']
+
+
+def test_parallel_keeps_a_trailing_partial_line(tmp_path, posts_path):
+    lines = read_lines(posts_path)
+    dump = write_lines(tmp_path / 'p.jsonl', lines[:-1] + [lines[-1].rstrip(b'\n')])
+    pd.testing.assert_frame_equal(aggregate_jsonl_parallel(dump, 'post', 3),
+                                  aggregate_jsonl(posts_path, 'post'))
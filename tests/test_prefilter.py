@@ -0,0 +1,24 @@
+from prefilter import Prefilter
+
+
+def test_asset_names_and_stems_pass_on_their_own():
+    screen = Prefilter(tickers={'GME'}, names={'gamestop'})
+    assert screen.score({'display_name_prefixed': 'r/gamestop'})[0] >= screen.min_score
+    assert screen.score({'display_name_prefixed': 'r/SafeMoonCoin'})[0] >= screen.min_score
+    assert screen.score({'display_name_prefixed': 'r/cooking', 'title': 'Recipes'})[0] == 0
+
+
+def test_a_ticker_in_the_name_needs_corroboration():
+    screen = Prefilter(tickers={'CATS', 'GME'}, names={'gamestop'})
+    assert screen.score({'display_name_prefixed': 'r/cats', 'title': 'Cats'})[0] < screen.min_score
+    assert screen.score({'display_name_prefixed': 'r/GME', 'title': 'GameStop'})[0] >= screen.min_score
+    assert screen.score({'display_name_prefixed': 'r/cats', 'description': '$CATS token'})[0] \
+        >= screen.min_score
+
+
+def test_audit_sample_is_stable():
+    screen = Prefilter(audit_rate=0.5)
+    items = [{'display_name_prefixed': f'r/sub{i}'} for i in range(200)]
+    picked = [screen.audited(item) for item in items]
+    assert picked == [screen.audited(item) for item in items]
+    assert 60 < sum(picked) < 140
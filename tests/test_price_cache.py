@@ -0,0 +1,41 @@
+import pandas as pd
+
+from price_cache import LocalProvider, PriceCache
+
+
+def test_price_cache_fetches_only_missing_ranges(tmp_path):
+    prices = pd.DataFrame({'date': pd.bdate_range('2024-01-01', '2024-01-31'), 'Close': 1.0,
+                           'Open': 2.0, 'Volume': 3})
+    (tmp_path / 'src').mkdir()
+    prices.to_csv(tmp_path / 'src' / 'X.csv', index=False)
+    provider = LocalProvider(tmp_path / 'src')
+    cache = PriceCache(tmp_path / 'cache', provider)
+
+    first = cache.get('X', '2024-01-01', '2024-01-15')
+    assert len(first) == 10 and len(provider.calls) == 1
+    cache.get('X', '2024-01-05', '2024-01-10')
+    assert len(provider.calls) == 1
+    both = cache.get('X', '2024-01-01', '2024-01-31')
+    assert len(provider.calls) == 2
+    assert both.index.equals(pd.DatetimeIndex(prices['date'][:-1], name='date'))
+
+    offline = PriceCache(tmp_path / 'cache', provider, offline=True)
+    assert len(offline.get('X', '2024-01-01', '2024-01-31')) == 22
+
+
+def test_price_cache_retries_an_empty_weekday_download(tmp_path):
+    calls = []
+
+    def failing(ticker, start, end):
+        calls.append((start, end))
+        return pd.DataFrame()
+
+    cache = PriceCache(tmp_path, failing)
+    assert cache.get('X', '2024-01-01', '2024-01-06').empty
+    cache.get('X', '2024-01-01', '2024-01-06')
+    assert len(calls) == 2
+
+    # a weekend has no rows to return, so an empty answer covers it
+    cache.get('X', '2024-01-06', '2024-01-08')
+    cache.get('X', '2024-01-06', '2024-01-08')
+    assert len(calls) == 3
@@ -0,0 +1,29 @@
+from response_cache import ResponseCache, cache_key
+
+
+def test_cache_key_depends_on_model_prompt_and_item():
+    item = {'display_name_prefixed': 'r/GME', 'title': 'GameStop'}
+    key = cache_key('m', 'sys', item)
+    assert key == cache_key('m', 'sys', dict(reversed(list(item.items()))))
+    assert key != cache_key('m2', 'sys', item)
+    assert key != cache_key('m', 'sys2', item)
+    assert key != cache_key('m', 'sys', {**item, 'title': 'GME'})
+
+
+def test_entries_persist_and_the_last_one_wins(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    with ResponseCache(path) as cache:
+        cache.put('a', {'x': 1})
+        cache.put('a', {'x': 2})
+        assert cache.get('a') == {'x': 2} and cache.get('b') is None
+        assert (cache.hits, cache.misses) == (1, 1)
+    assert ResponseCache(path).entries == {'a': {'x': 2}}
+
+
+def test_response_cache_survives_a_truncated_line(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    path.write_text('{"key": "a", "result": {"x": 1}}\n{"other": 1}\n{"key": "b", "res')
+    with ResponseCache(path) as cache:
+        assert cache.entries == {'a': {'x': 1}}
+        cache.put('c', {'y': 2})
+    assert ResponseCache(path).entries == {'a': {'x': 1}, 'c': {'y': 2}}
@@ -0,0 +1,52 @@
+import os
+import runpy
+import sys
+import types
+
+import pandas as pd
+
+from conftest import FIXTURES, assert_same_panel, baseline_groupby, read_lines, write_lines
+from price_cache import LocalProvider, PriceCache
+from raw_data_to_csv import build_panel
+from stream_aggregate import aggregate_jsonl
+
+
+def test_stream_matches_groupby(posts_path, comments_path):
+    frame = aggregate_jsonl(posts_path, 'post')
+    assert_same_panel(frame, baseline_groupby(read_lines(posts_path)))
+    assert frame['post_upvotes'].dtype == 'int64'
+    frame = aggregate_jsonl(comments_path, 'comment')
+    assert_same_panel(frame, baseline_groupby(read_lines(comments_path), 'comment'))
+
+
+def test_panel_csv_is_byte_identical_to_the_original_script(tmp_path, monkeypatch,
+                                                             posts_path, comments_path):
+    days = pd.bdate_range('2020-12-21', '2021-01-22')
+    prices = pd.DataFrame({'Close': [100 + 0.25 * i for i in range(len(days))],
+                           'Open': [99.5 + 0.5 * i for i in range(len(days))],
+                           'Volume': [1000 * (i + 1) for i in range(len(days))]},
+                          index=pd.DatetimeIndex(days, name='date'))
+    (tmp_path / 'prices').mkdir()
+    prices.to_csv(tmp_path / 'prices' / 'AMD.csv')
+
+    def download(ticker, start, end, auto_adjust=False):
+        part = prices[(prices.index >= start) & (prices.index < end)].copy()
+        part.columns = pd.MultiIndex.from_product([part.columns, [ticker]])
+        return part
+
+    raw = tmp_path / 'data_raw' / 'AMD'
+    raw.mkdir(parents=True)
+    # the original script fails on a null author, so those records are left out
+    for src, dst in ((posts_path, 'r_amd_stock_posts.jsonl'), (comments_path, 'r_amd_stock_comments.jsonl')):
+        write_lines(raw / dst, [l for l in read_lines(src) if b'"author": null' not in l])
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(sys.modules, 'yfinance', types.SimpleNamespace(download=download))
+    runpy.run_path(os.path.join(FIXTURES, 'raw_data_to_csv_baseline.py'))
+
+    cache = PriceCache(tmp_path / 'cache', LocalProvider(tmp_path / 'prices'))
+    build_panel('AMD', str(raw / 'r_amd_stock_posts.jsonl'), str(raw / 'r_amd_stock_comments.jsonl'),
+                'panel', workers=1, price_cache=cache)
+
+    expected = (tmp_path / 'AMD_data.csv').read_bytes()
+    assert len(expected.splitlines()) == 12
+    assert (tmp_path / 'panel.csv').read_bytes() == expected
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from conftest import write_lines
+from subreddit_filter import SubredditProfile, filter_subreddits
+
+
+def sub(name, comments=5000, posts=2000, **kw):
+    obj = {'display_name': name, 'over18': False, 'lang': 'en', 'subreddit_type': 'public',
+           '_meta': {'num_comments': comments, 'num_posts': posts}}
+    obj.update(kw)
+    return (json.dumps(obj) + '\n').encode()
+
+
+LINES = [
+    sub('keep'),
+    sub('edge', 3000, 1500),
+    sub('quiet', 2999, 9000),
+    sub('lurkers', 9000, 1499),
+    sub('both_low', 10, 10),
+    sub('adult', over18=True),
+    sub('closed', subreddit_type='private'),
+    sub('no_meta', _meta=None),
+    sub('list_meta', _meta=[1, 2]),
+    sub('text_counts', 'lots', 2000),
+    b'[1, 2]\n',
+    b'{"display_name": \n',
+]
+
+
+def test_drop_rule_is_either_minimum():
+    profile = SubredditProfile()
+    kept = [json.loads(l)['display_name'] for l in LINES if profile.keep(l)]
+    assert kept == ['keep', 'edge']
+    assert dict(profile.dropped) == {'few_comments': 3, 'few_posts': 1, 'nsfw': 1, 'private': 1,
+                                     'malformed': 4}
+    report = profile.to_dict()
+    assert report['criteria']['rule'] == 'drop if num_comments < min_comments or num_posts < min_posts'
+    assert report['lines'] == len(LINES) and report['kept'] == 2
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_filter_writes_kept_lines_in_order(tmp_path, workers):
+    dump = write_lines(tmp_path / 'subs.jsonl', LINES * 20)
+    profile = filter_subreddits(dump, tmp_path / 'out.jsonl', workers)
+    assert (tmp_path / 'out.jsonl').read_bytes() == (LINES[0] + LINES[1]) * 20
+    assert profile.kept == 40 and profile.dropped['malformed'] == 80